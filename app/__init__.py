@@ -32,5 +32,13 @@ def create_app(config_class=Config):
     app.register_blueprint(wishlist.bp)
     from .routes import search
     app.register_blueprint(search.bp)
+    from .routes import async_api
+    app.register_blueprint(async_api.bp)
+    from .routes import metrics
+    app.register_blueprint(metrics.bp)
+
+    from .commands import cache_cli, rawg_cli
+    app.cli.add_command(cache_cli)
+    app.cli.add_command(rawg_cli)
 
     return app
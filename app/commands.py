@@ -0,0 +1,146 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.services import game_service, wishlist_service
+from app.utils import caching, rate_budget
+
+cache_cli = AppGroup('cache', help='Cache maintenance commands.')
+rawg_cli = AppGroup('rawg', help='RAWG API usage commands.')
+
+
+class _RateLimiter:
+    # Spaces task starts evenly so warming never exceeds `rate` calls/second.
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _split(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def _warm_trending(ordering, platform_id, pages, limiter):
+    written = 0
+    page = 1
+    while page and page <= pages:
+        limiter.wait()
+        data = game_service.get_trending_games.refresh(page, ordering, platform_id)
+        written += 1
+        page = data.get('nextPage')
+    return written
+
+
+def _warm_game(game_id, limiter):
+    limiter.wait()
+    return game_service.warm_game_projections(game_id)
+
+
+def _run_in_context(app, fn, *args):
+    with app.app_context(), rate_budget.background():
+        return fn(*args)
+
+
+def run_warm(pages, orderings, platforms, top_games, workers, rate):
+    app = current_app._get_current_object()
+    limiter = _RateLimiter(rate)
+    start = time.perf_counter()
+    written = 0
+    failed = 0
+
+    game_ids = wishlist_service.get_most_wishlisted_game_ids(top_games) if top_games > 0 else []
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cache-warm') as executor:
+        futures = {}
+        for ordering in orderings:
+            for platform_id in platforms:
+                future = executor.submit(_run_in_context, app, _warm_trending, ordering, platform_id, pages, limiter)
+                futures[future] = f"trending ordering={ordering} platform={platform_id}"
+        for game_id in game_ids:
+            future = executor.submit(_run_in_context, app, _warm_game, game_id, limiter)
+            futures[future] = f"game_id {game_id}"
+
+        for future in as_completed(futures):
+            try:
+                written += future.result()
+            except Exception as e:
+                failed += 1
+                current_app.logger.warning(f"Cache warm failed for {futures[future]}: {e}")
+
+    return {
+        'keys_written': written,
+        'failed': failed,
+        'games': len(game_ids),
+        'seconds': round(time.perf_counter() - start, 2)
+    }
+
+
+@cache_cli.command('warm')
+@click.option('--pages', default=3, show_default=True, help='Trending pages per ordering/platform.')
+@click.option('--orderings', default='-relevance', show_default=True, help='Comma-separated RAWG orderings.')
+@click.option('--platforms', default=',4,187,18,1,7', show_default=True,
+              help='Comma-separated RAWG platform ids; an empty item means all platforms.')
+@click.option('--top-games', default=200, show_default=True, help='Most-wishlisted games to warm previews for.')
+@click.option('--workers', default=4, show_default=True, help='Concurrent fetches.')
+@click.option('--rate', default=5.0, show_default=True, help='Maximum fetches started per second.')
+@click.option('--interval', default=0, show_default=True,
+              help='Repeat every N seconds (scheduled mode); 0 runs once.')
+def warm(pages, orderings, platforms, top_games, workers, rate, interval):
+    """Pre-populate trending pages and previews of wishlisted games."""
+    platform_ids = [item.strip() or None for item in platforms.split(',')]
+    ordering_list = _split(orderings)
+
+    while True:
+        report = run_warm(pages, ordering_list, platform_ids, top_games, workers, rate)
+        click.echo(
+            f"Warmed {report['keys_written']} keys "
+            f"({report['games']} games, {report['failed']} failed) in {report['seconds']}s"
+        )
+        if interval <= 0:
+            break
+        time.sleep(interval)
+
+
+@cache_cli.command('report')
+@click.option('--days', default=1, show_default=True, help='Number of past days (UTC) to count over.')
+def report(days):
+    """Show distinct cache keys per cached function (HyperLogLog estimates)."""
+    click.echo(f"{'function':<20} {'computed':>10} {'admitted':>10}")
+    for name in sorted(set(caching.registry)):
+        counts = caching.get_cardinality(name, days)
+        if counts is None:
+            raise click.ClickException('Key cardinality is only tracked with the Redis cache.')
+        click.echo(f"{name:<20} {counts['computed']:>10} {counts['admitted']:>10}")
+
+
+@rawg_cli.command('usage')
+@click.option('--minutes', default=60, show_default=True, help='Number of past minutes to show.')
+def usage(minutes):
+    """Show RAWG calls per minute from the shared rate budget counters."""
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    moments = [now - timedelta(minutes=offset) for offset in range(minutes - 1, -1, -1)]
+    rows = rate_budget.get_usage(moments)
+    fields = (rate_budget.INTERACTIVE, rate_budget.BACKGROUND,
+              f"rejected_{rate_budget.INTERACTIVE}", f"rejected_{rate_budget.BACKGROUND}")
+
+    click.echo('minute            ' + ' '.join(f"{field:>22}" for field in fields))
+    totals = dict.fromkeys(fields, 0)
+    for row in rows:
+        click.echo(f"{row['minute']}  " + ' '.join(f"{row.get(field, 0):>22}" for field in fields))
+        for field in fields:
+            totals[field] += row.get(field, 0)
+    click.echo('total             ' + ' '.join(f"{totals[field]:>22}" for field in fields))
@@ -21,11 +21,81 @@ class Config:
 
     _REDIS_HOST = os.environ.get("REDIS_HOST", "redis")
     _REDIS_PORT = os.environ.get("REDIS_PORT", 6379)
-    CACHE_TYPE = "redis"
+    CACHE_LOCAL_ENABLED = os.environ.get("CACHE_LOCAL_ENABLED", "false").lower() == "true"
+    CACHE_TYPE = "app.utils.tiered_cache.TieredRedisCache" if CACHE_LOCAL_ENABLED else "redis"
+    CACHE_LOCAL_MAX_ENTRIES = int(os.environ.get("CACHE_LOCAL_MAX_ENTRIES", 1024))
+    CACHE_LOCAL_TIMEOUT = int(os.environ.get("CACHE_LOCAL_TIMEOUT", 5))
+    CACHE_LOCAL_INVALIDATION_CHANNEL = "cache:invalidate"
     CACHE_REDIS_URL = f"redis://{_REDIS_HOST}:{_REDIS_PORT}/0"
     CACHE_DEFAULT_TIMEOUT = int(os.environ.get("CACHE_DEFAULT_TIMEOUT", 3600))
+    CACHE_STALE_TTL = int(os.environ.get("CACHE_STALE_TTL", 3600))
+    CACHE_LOCK_TIMEOUT = float(os.environ.get("CACHE_LOCK_TIMEOUT", 15))
+    CACHE_LOCK_WAIT = float(os.environ.get("CACHE_LOCK_WAIT", 3))
+    CACHE_LOCK_POLL_INTERVAL = float(os.environ.get("CACHE_LOCK_POLL_INTERVAL", 0.05))
+    CACHE_REFRESH_WORKERS = int(os.environ.get("CACHE_REFRESH_WORKERS", 2))
+    CACHE_ADMISSION_MIN_HITS = int(os.environ.get("CACHE_ADMISSION_MIN_HITS", 2))
+    CACHE_ADMISSION_WINDOW = int(os.environ.get("CACHE_ADMISSION_WINDOW", 3600))
+    CACHE_ADMISSION_PROBATION_TTL = int(os.environ.get("CACHE_ADMISSION_PROBATION_TTL", 60))
 
     RAWG_API_KEY = os.environ.get('RAWG_API_KEY')
+    RAWG_CONNECT_TIMEOUT = float(os.environ.get("RAWG_CONNECT_TIMEOUT", 3.05))
+    RAWG_READ_TIMEOUT = float(os.environ.get("RAWG_READ_TIMEOUT", 10))
+    RAWG_SEARCH_TIMEOUT = float(os.environ.get("RAWG_SEARCH_TIMEOUT", 5))
+    RAWG_POOL_MAXSIZE = int(os.environ.get("RAWG_POOL_MAXSIZE", 10))
+    RAWG_MAX_RETRIES = int(os.environ.get("RAWG_MAX_RETRIES", 2))
+    RAWG_RETRY_BACKOFF = float(os.environ.get("RAWG_RETRY_BACKOFF", 0.3))
+    RAWG_RETRY_JITTER = float(os.environ.get("RAWG_RETRY_JITTER", 0.2))
+    RAWG_RETRY_BACKOFF_MAX = float(os.environ.get("RAWG_RETRY_BACKOFF_MAX", 2))
+    RAWG_ASYNC_MAX_CONNECTIONS = int(os.environ.get("RAWG_ASYNC_MAX_CONNECTIONS", 100))
+    RAWG_CB_ENABLED = os.environ.get("RAWG_CB_ENABLED", "true").lower() == "true"
+    RAWG_CB_WINDOW = int(os.environ.get("RAWG_CB_WINDOW", 30))
+    RAWG_CB_MIN_REQUESTS = int(os.environ.get("RAWG_CB_MIN_REQUESTS", 10))
+    RAWG_CB_ERROR_RATE = float(os.environ.get("RAWG_CB_ERROR_RATE", 0.5))
+    RAWG_CB_SLOW_CALL_SECONDS = float(os.environ.get("RAWG_CB_SLOW_CALL_SECONDS", 5))
+    RAWG_CB_SLOW_RATE = float(os.environ.get("RAWG_CB_SLOW_RATE", 0.5))
+    RAWG_CB_OPEN_SECONDS = float(os.environ.get("RAWG_CB_OPEN_SECONDS", 30))
+    RAWG_CB_PROBE_TIMEOUT = float(os.environ.get("RAWG_CB_PROBE_TIMEOUT", 15))
+    RAWG_BUDGET_ENABLED = os.environ.get("RAWG_BUDGET_ENABLED", "true").lower() == "true"
+    RAWG_BUDGET_RATE = float(os.environ.get("RAWG_BUDGET_RATE", 5))
+    RAWG_BUDGET_BURST = int(os.environ.get("RAWG_BUDGET_BURST", 50))
+    RAWG_BUDGET_BACKGROUND_RESERVE = float(os.environ.get("RAWG_BUDGET_BACKGROUND_RESERVE", 0.5))
+    RAWG_BUDGET_USAGE_TTL = int(os.environ.get("RAWG_BUDGET_USAGE_TTL", 8 * 86400))
+
+    GAME_PREVIEW_MAX_WORKERS = int(os.environ.get("GAME_PREVIEW_MAX_WORKERS", 8))
+    GAME_PREVIEW_DEADLINE = float(os.environ.get("GAME_PREVIEW_DEADLINE", 8))
+    GAME_PREVIEW_ASYNC_CONCURRENCY = int(os.environ.get("GAME_PREVIEW_ASYNC_CONCURRENCY", 20))
+    GAMES_BATCH_MAX_IDS = int(os.environ.get("GAMES_BATCH_MAX_IDS", 50))
+    WISHLIST_BULK_MAX_IDS = int(os.environ.get("WISHLIST_BULK_MAX_IDS", 5000))
+    WISHLIST_VERSION_TTL = int(os.environ.get("WISHLIST_VERSION_TTL", 86400))
+    USER_SEARCH_MODE = os.environ.get("USER_SEARCH_MODE", "indexed")
+    USER_SEARCH_COUNT_MODE = os.environ.get("USER_SEARCH_COUNT_MODE", "cached")
+    USER_SEARCH_COUNT_TTL = int(os.environ.get("USER_SEARCH_COUNT_TTL", 60))
+    SEARCH_ALL_DEADLINE = float(os.environ.get("SEARCH_ALL_DEADLINE", 3))
+    SEARCH_ALL_MAX_WORKERS = int(os.environ.get("SEARCH_ALL_MAX_WORKERS", 8))
+    SEARCH_GAMES_MAX_LIMIT = int(os.environ.get("SEARCH_GAMES_MAX_LIMIT", 40))
+    GAME_INDEX_ENABLED = os.environ.get("GAME_INDEX_ENABLED", "true").lower() == "true"
+    GAME_INDEX_REFRESH_INTERVAL = int(os.environ.get("GAME_INDEX_REFRESH_INTERVAL", 600))
+    GAME_INDEX_MIN_QUERY_LENGTH = int(os.environ.get("GAME_INDEX_MIN_QUERY_LENGTH", 3))
+    GAME_INDEX_UPSTREAM_COUNT_TTL = int(os.environ.get("GAME_INDEX_UPSTREAM_COUNT_TTL", 3600))
+    TRENDING_PREFETCH_ENABLED = os.environ.get("TRENDING_PREFETCH_ENABLED", "false").lower() == "true"
+    TRENDING_PREFETCH_MAX_PAGE = int(os.environ.get("TRENDING_PREFETCH_MAX_PAGE", 10))
+    HTTP_CACHE_ENABLED = os.environ.get("HTTP_CACHE_ENABLED", "true").lower() == "true"
+    HTTP_CACHE_TRENDING_MAX_AGE = int(os.environ.get("HTTP_CACHE_TRENDING_MAX_AGE", 300))
+    HTTP_CACHE_TRENDING_SWR = int(os.environ.get("HTTP_CACHE_TRENDING_SWR", 1200))
+    HTTP_CACHE_GAME_MAX_AGE = int(os.environ.get("HTTP_CACHE_GAME_MAX_AGE", 3600))
+    HTTP_CACHE_GAME_SWR = int(os.environ.get("HTTP_CACHE_GAME_SWR", 86400))
+    HTTP_CACHE_SEARCH_MAX_AGE = int(os.environ.get("HTTP_CACHE_SEARCH_MAX_AGE", 300))
+    HTTP_CACHE_SEARCH_SWR = int(os.environ.get("HTTP_CACHE_SEARCH_SWR", 1200))
+    RESPONSE_BODY_CACHE_ENABLED = os.environ.get("RESPONSE_BODY_CACHE_ENABLED", "false").lower() == "true"
+    RESPONSE_BODY_CACHE_TTL = int(os.environ.get("RESPONSE_BODY_CACHE_TTL", 300))
+    RESPONSE_BODY_COMPRESS_MIN_BYTES = int(os.environ.get("RESPONSE_BODY_COMPRESS_MIN_BYTES", 512))
+    RESPONSE_BODY_GZIP_LEVEL = int(os.environ.get("RESPONSE_BODY_GZIP_LEVEL", 6))
+    RESPONSE_BODY_BROTLI_QUALITY = int(os.environ.get("RESPONSE_BODY_BROTLI_QUALITY", 5))
+    GAME_PROJECTION_CACHE_TIMEOUT = int(os.environ.get("GAME_PROJECTION_CACHE_TIMEOUT", 86400))
+    GAME_NOT_FOUND_TTL = int(os.environ.get("GAME_NOT_FOUND_TTL", 600))
+    GAME_CATALOG_TTL = int(os.environ.get("GAME_CATALOG_TTL", 86400))
+    GAME_CATALOG_REFRESH_WORKERS = int(os.environ.get("GAME_CATALOG_REFRESH_WORKERS", 2))
+
     SWAGGER = {
         'openapi': '3.0.2',
         'info': {
@@ -1,2 +1,4 @@
 from .user import User
-from .wishlist import Wishlist
\ No newline at end of file
+from .wishlist import Wishlist
+from .game import Game
+from .username_trigram import UsernameTrigram
\ No newline at end of file
@@ -0,0 +1,51 @@
+from app.extensions import db
+from datetime import datetime, timezone
+
+
+class Game(db.Model):
+    __tablename__ = 'games'
+
+    # RAWG game id, not generated locally
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+    name = db.Column(db.String(255))
+    background_image = db.Column(db.String(512))
+    metacritic = db.Column(db.Integer)
+    parent_platforms = db.Column(db.JSON, nullable=False, default=list)
+
+    description = db.Column(db.Text)
+    released = db.Column(db.String(10))
+    website = db.Column(db.String(512))
+    genres = db.Column(db.JSON, nullable=False, default=list)
+    platforms = db.Column(db.JSON, nullable=False, default=list)
+
+    fetched_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc)
+    )
+
+    def to_preview(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'background_image': self.background_image,
+            'metacritic': self.metacritic,
+            'parent_platforms': self.parent_platforms or []
+        }
+
+    def to_details(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'description': self.description,
+            'metacritic': self.metacritic,
+            'released': self.released,
+            'background_image': self.background_image,
+            'website': self.website,
+            'genres': self.genres or [],
+            'platforms': self.platforms or [],
+        }
+
+    def __repr__(self):
+        return f'<Game id={self.id} name={self.name!r}>'
@@ -14,6 +14,9 @@ class User(db.Model):
     wishlist_items = db.relationship('Wishlist',
                                      back_populates='user',
                                      cascade='all, delete-orphan')
+    username_trigrams = db.relationship('UsernameTrigram',
+                                        cascade='all, delete-orphan',
+                                        passive_deletes=True)
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -0,0 +1,19 @@
+from sqlalchemy import ForeignKey
+from app.extensions import db
+
+
+def trigrams(text):
+    text = (text or '').lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class UsernameTrigram(db.Model):
+    # Side table for substring search over usernames: a username contains q
+    # only if it has every trigram of q, and (trigram, user_id) is indexed.
+    __tablename__ = 'username_trigrams'
+
+    trigram = db.Column(db.String(3), primary_key=True)
+    user_id = db.Column(db.Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True, index=True)
+
+    def __repr__(self):
+        return f'<UsernameTrigram {self.trigram!r} user_id={self.user_id}>'
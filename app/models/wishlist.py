@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import ForeignKey, UniqueConstraint, Index
 from app.extensions import db
 from datetime import datetime, timezone
 
@@ -21,6 +21,7 @@ class Wishlist(db.Model):
 
     __table_args__ = (
         UniqueConstraint('user_id', 'rawg_game_id', name='_user_game_uc'),
+        Index('ix_wishlist_user_id_added_on_id', 'user_id', 'added_on', 'id'),
     )
 
     def __repr__(self):
@@ -0,0 +1,160 @@
+import requests
+from flask import Blueprint, jsonify, request, current_app
+from app.services import game_service, search_service, user_service, wishlist_service, rawg_async_client
+from app.exceptions.exceptions import ValidationException
+from app.schemas.user_schema import dump_user_search
+from app.utils import body_cache, http_cache
+
+# Async variants of the fan-out-heavy endpoints. They answer exactly like
+# their sync counterparts, but all RAWG calls of a request share one httpx
+# connection pool and run concurrently on the event loop.
+bp = Blueprint('async_api', __name__, url_prefix='/async')
+
+
+def swag_specs(specs):
+    # flasgger's swag_from wraps the view in a sync function, which hides the
+    # coroutine from Flask; async views only get the specs attached.
+    def decorator(function):
+        function.specs_dict = specs
+        return function
+    return decorator
+
+
+@bp.route('/search', methods=['GET'])
+@swag_specs({
+    'tags': ['Async'],
+    'summary': 'Universal search (Users + Games), async variant of /search',
+    'parameters': [
+        {'name': 'q', 'in': 'query', 'required': True, 'schema': {'type': 'string'}},
+        {'name': 'user_limit', 'in': 'query', 'schema': {'type': 'integer', 'minimum': 1, 'default': 5}},
+        {'name': 'game_limit', 'in': 'query', 'schema': {'type': 'integer', 'minimum': 1, 'default': 5}}
+    ],
+    'responses': {
+        200: {'description': 'Aggregated search results; branches that missed the deadline are listed in "missing"'},
+        400: {'description': 'Missing query parameter "q"'},
+        500: {'description': 'RAWG API key missing or other internal error'}
+    }
+})
+async def search_all():
+    q = request.args.get('q')
+    if not q:
+        return jsonify({"error": "Missing query parameter 'q'"}), 400
+
+    try:
+        user_limit = request.args.get('user_limit', 5, type=int)
+        game_limit = request.args.get('game_limit', 5, type=int)
+    except ValueError:
+        return jsonify({"error": "Invalid limit parameters"}), 400
+
+    try:
+        async with rawg_async_client.open_client():
+            results = await search_service.search_all_async(q, user_limit, game_limit)
+        users_json = dump_user_search(results['users'])
+
+        return jsonify({
+            "users": users_json,
+            "games": results['games'],
+            "missing": results['missing'],
+            "timings_ms": results['timings_ms']
+        }), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        current_app.logger.error(f"Unexpected error in /async/search: {e}")
+        return jsonify({"error": "Internal Server Error"}), 500
+
+
+@bp.route('/games/trending', methods=['GET'])
+@swag_specs({
+    'tags': ['Async'],
+    'summary': 'Get trending games from RAWG, async variant of /games/trending',
+    'parameters': [
+        {'name': 'page', 'in': 'query', 'schema': {'type': 'integer', 'minimum': 1}, 'required': False},
+        {'name': 'ordering', 'in': 'query', 'schema': {'type': 'string'}, 'required': False, 'description': 'RAWG ordering, e.g. -relevance'},
+        {'name': 'platform', 'in': 'query', 'schema': {'type': 'string'}, 'required': False, 'description': 'RAWG platform id or comma-separated ids, e.g. 4,187'}
+    ],
+    'responses': {
+        200: {'description': 'Trending games page'},
+        400: {'description': 'Invalid query parameters'},
+        500: {'description': 'RAWG API key missing or upstream error'},
+        503: {'description': 'Failed to fetch from RAWG'}
+    }
+})
+async def get_trending_games():
+    try:
+        page = request.args.get('page', 1, type=int)
+        ordering = request.args.get('ordering', '-relevance')
+        platform_id = game_service.canonical_platform_ids(request.args.get('platform'))
+    except ValueError:
+        return jsonify({"error": "Invalid query parameters"}), 400
+
+    try:
+        body_key = game_service.get_trending_games.make_cache_key(page, ordering, platform_id)
+        response = body_cache.serve(body_key, 'games.trending')
+        if response is not None:
+            return response
+
+        async with rawg_async_client.open_client():
+            data = await game_service.get_trending_games_async(page, ordering, platform_id)
+        game_service.prefetch_next_trending_page(data, ordering, platform_id)
+        return body_cache.store(body_key, 'games.trending', data, http_cache.public_response(data, 'games.trending'))
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 500
+    except requests.exceptions.RequestException as e:
+        return jsonify({"error": f"Failed to fetch from RAWG: {str(e)}"}), 503
+    except Exception as e:
+        return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
+
+
+@bp.route('/users/<string:username>/wishlist', methods=['GET'])
+@swag_specs({
+    'tags': ['Async'],
+    'summary': "Get a user's wishlist previews, async variant of /users/<username>/wishlist",
+    'parameters': [
+        {'name': 'username', 'in': 'path', 'required': True, 'schema': {'type': 'string'}},
+        {'name': 'page', 'in': 'query', 'required': False, 'schema': {'type': 'integer', 'minimum': 1}},
+        {'name': 'limit', 'in': 'query', 'required': False, 'schema': {'type': 'integer', 'minimum': 1, 'maximum': 100}},
+        {'name': 'cursor', 'in': 'query', 'required': False, 'schema': {'type': 'string'},
+         'description': 'Keyset mode: pass an empty value for the first page, then nextCursor. Ignores page.'}
+    ],
+    'responses': {
+        200: {'description': 'Paginated wishlist previews'},
+        304: {'description': 'Wishlist unchanged since the ETag in If-None-Match'},
+        404: {'description': 'User not found'},
+        500: {'description': 'RAWG API key not configured or fetch error'}
+    }
+})
+async def get_user_wishlist(username):
+    try:
+        page = request.args.get('page', 1, type=int)
+        limit = request.args.get('limit', 5, type=int)
+        if page < 1: page = 1
+        if limit < 1 or limit > 100: limit = 5
+    except ValueError:
+        page = 1
+        limit = 5
+
+    try:
+        user = user_service.get_user_by_username(username)
+        if user is None:
+            return jsonify({"error": "User not found"}), 404
+
+        cursor = request.args.get('cursor')
+        etag = wishlist_service.get_preview_page_etag(user.id, cursor, page, limit)
+        if http_cache.is_not_modified('users.wishlist', etag):
+            return http_cache.not_modified(etag, http_cache.REVALIDATE)
+
+        preview_page = wishlist_service.get_preview_page(user.id, cursor, page, limit)
+        async with rawg_async_client.open_client():
+            previews, failed, _ = await game_service.resolve_game_previews_async(
+                preview_page['rawg_ids'], preview_page['catalog_games']
+            )
+        body = wishlist_service.preview_page_body(preview_page, previews)
+        return http_cache.versioned_response(body, etag, complete=not failed), 200
+
+    except ValidationException as e:
+        return jsonify({"error": e.message}), e.status_code
+    except Exception as e:
+        return jsonify({"error": f"Internal Server Error: {str(e)}"}), 500
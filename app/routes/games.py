@@ -1,7 +1,8 @@
 import requests
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from flasgger import swag_from
 from app.services import game_service
+from app.utils import body_cache, http_cache
 
 bp = Blueprint('games', __name__, url_prefix='/games')
 
@@ -13,7 +14,7 @@ bp = Blueprint('games', __name__, url_prefix='/games')
     'parameters': [
         {'name': 'page', 'in': 'query', 'schema': {'type': 'integer', 'minimum': 1}, 'required': False},
         {'name': 'ordering', 'in': 'query', 'schema': {'type': 'string'}, 'required': False, 'description': 'RAWG ordering, e.g. -relevance'},
-        {'name': 'platform', 'in': 'query', 'schema': {'type': 'string'}, 'required': False, 'description': 'RAWG platform id'}
+        {'name': 'platform', 'in': 'query', 'schema': {'type': 'string'}, 'required': False, 'description': 'RAWG platform id or comma-separated ids, e.g. 4,187'}
     ],
     'responses': {
         200: {
@@ -33,6 +34,8 @@ bp = Blueprint('games', __name__, url_prefix='/games')
                 }
             }
         },
+        304: {'description': 'Not modified since the ETag in If-None-Match (or If-Modified-Since)'},
+        400: {'description': 'Invalid query parameters'},
         500: {'description': 'RAWG API key missing or upstream error'},
         503: {'description': 'Failed to fetch from RAWG'}
     }
@@ -41,13 +44,19 @@ def get_trending_games():
     try:
         page = request.args.get('page', 1, type=int)
         ordering = request.args.get('ordering', '-relevance')
-        platform_id = request.args.get('platform')
+        platform_id = game_service.canonical_platform_ids(request.args.get('platform'))
     except ValueError:
         return jsonify({"error": "Invalid query parameters"}), 400
 
     try:
+        body_key = game_service.get_trending_games.make_cache_key(page, ordering, platform_id)
+        response = body_cache.serve(body_key, 'games.trending')
+        if response is not None:
+            return response
+
         data = game_service.get_trending_games(page, ordering, platform_id)
-        return jsonify(data), 200
+        game_service.prefetch_next_trending_page(data, ordering, platform_id)
+        return body_cache.store(body_key, 'games.trending', data, http_cache.public_response(data, 'games.trending'))
 
     except ValueError as e:
         return jsonify({"error": str(e)}), 500
@@ -56,6 +65,61 @@ def get_trending_games():
     except Exception as e:
         return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
 
+@bp.route('/batch', methods=['GET'])
+@swag_from({
+    'tags': ['Games'],
+    'summary': 'Get game previews for a list of RAWG ids',
+    'parameters': [
+        {'name': 'ids', 'in': 'query', 'required': True, 'schema': {'type': 'string'}, 'description': 'Comma-separated RAWG game ids, e.g. 1,2,3'}
+    ],
+    'responses': {
+        200: {
+            'description': 'Previews in input order and ids that could not be resolved',
+            'content': {
+                'application/json': {
+                    'examples': {
+                        'example': {
+                            'value': {
+                                'games': [
+                                    { 'id': 123, 'name': 'Foo', 'background_image': '...', 'metacritic': 90, 'parent_platforms': ['pc'] }
+                                ],
+                                'missing': [456]
+                            }
+                        }
+                    }
+                }
+            }
+        },
+        400: {'description': 'Missing, invalid or too many ids'},
+        500: {'description': 'Internal Server Error'}
+    }
+})
+def get_games_batch():
+    raw_ids = request.args.get('ids', '')
+    try:
+        game_ids = [int(part) for part in raw_ids.split(',') if part.strip()]
+    except ValueError:
+        return jsonify({"error": "Invalid query parameter 'ids'"}), 400
+    if any(game_id < 1 for game_id in game_ids):
+        return jsonify({"error": "Invalid query parameter 'ids'"}), 400
+
+    game_ids = list(dict.fromkeys(game_ids))
+    if not game_ids:
+        return jsonify({"error": "Missing query parameter 'ids'"}), 400
+
+    max_ids = current_app.config['GAMES_BATCH_MAX_IDS']
+    if len(game_ids) > max_ids:
+        return jsonify({"error": f"At most {max_ids} ids per request"}), 400
+
+    try:
+        previews, _, _ = game_service.resolve_game_previews(game_ids)
+        return jsonify({
+            "games": [previews[game_id] for game_id in game_ids if game_id in previews],
+            "missing": [game_id for game_id in game_ids if game_id not in previews]
+        }), 200
+    except Exception as e:
+        return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
+
 @bp.route('/<int:game_id>', methods=['GET'])
 @swag_from({
     'tags': ['Games'],
@@ -86,6 +150,7 @@ def get_trending_games():
                 }
             }
         },
+        304: {'description': 'Not modified since the ETag in If-None-Match'},
         404: {'description': 'Game not found'},
         500: {'description': 'RAWG API key missing or HTTP error'},
         503: {'description': 'Failed to fetch from RAWG'}
@@ -93,8 +158,13 @@ def get_trending_games():
 })
 def get_game_details(game_id):
     try:
+        body_key = game_service.DETAILS_CACHE_KEY.format(game_id)
+        response = body_cache.serve(body_key, 'games.details')
+        if response is not None:
+            return response
+
         game_details = game_service.get_game_details(game_id)
-        return jsonify(game_details), 200
+        return body_cache.store(body_key, 'games.details', game_details, http_cache.public_response(game_details, 'games.details'))
 
     except ValueError as e:
         return jsonify({"error": str(e)}), 500
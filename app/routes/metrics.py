@@ -0,0 +1,21 @@
+from flask import Blueprint, jsonify
+from flasgger import swag_from
+from app.services import rawg_client
+from app.utils import metrics
+
+bp = Blueprint('metrics', __name__, url_prefix='/metrics')
+
+
+@bp.route('', methods=['GET'])
+@swag_from({
+    'tags': ['Metrics'],
+    'summary': 'In-process metrics of the worker that serves the request',
+    'responses': {
+        200: {'description': 'Counters, gauges and latency percentiles'}
+    }
+})
+def get_metrics():
+    snapshot = metrics.snapshot()
+    # Shared across workers, so read from Redis rather than per-worker gauges.
+    snapshot['circuits'] = {'rawg': rawg_client.breaker.state()}
+    return jsonify(snapshot), 200
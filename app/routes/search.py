@@ -1,7 +1,8 @@
 from flask import Blueprint, jsonify, request, current_app
 from flasgger import swag_from
 from app.services import search_service
-from app.schemas.user_schema import  user_search_schema
+from app.schemas.user_schema import dump_user_search
+from app.utils import http_cache
 
 bp = Blueprint('search', __name__, url_prefix='/search')
 
@@ -16,7 +17,7 @@ bp = Blueprint('search', __name__, url_prefix='/search')
         {'name': 'game_limit', 'in': 'query', 'schema': {'type': 'integer', 'minimum': 1, 'default': 5}}
     ],
     'responses': {
-        200: {'description': 'Aggregated search results'},
+        200: {'description': 'Aggregated search results; branches that missed the deadline are listed in "missing"'},
         400: {'description': 'Missing query parameter "q"'},
         500: {'description': 'RAWG API key missing or other internal error'}
     }
@@ -34,11 +35,13 @@ def search_all():
 
     try:
         results = search_service.search_all(q, user_limit, game_limit)
-        users_json = user_search_schema.dump(results['users'], many=True)
+        users_json = dump_user_search(results['users'])
 
         return jsonify({
             "users": users_json,
-            "games": results['games']
+            "games": results['games'],
+            "missing": results['missing'],
+            "timings_ms": results['timings_ms']
         }), 200
 
     except ValueError as e:
@@ -55,11 +58,15 @@ def search_all():
     'parameters': [
         {'name': 'q', 'in': 'query', 'required': True, 'schema': {'type': 'string'}},
         {'name': 'page', 'in': 'query', 'schema': {'type': 'integer', 'minimum': 1, 'default': 1}},
-        {'name': 'limit', 'in': 'query', 'schema': {'type': 'integer', 'minimum': 1, 'default': 20}}
+        {'name': 'limit', 'in': 'query', 'schema': {'type': 'integer', 'minimum': 1, 'default': 20}},
+        {'name': 'cursor', 'in': 'query', 'schema': {'type': 'string'}, 'required': False,
+         'description': 'Keyset mode: pass an empty value for the first page, then next_cursor. No totals are returned.'},
+        {'name': 'count', 'in': 'query', 'schema': {'type': 'string', 'enum': ['exact', 'cached', 'none']}, 'required': False,
+         'description': 'Page mode: how total_count is computed (cached counts are at most USER_SEARCH_COUNT_TTL seconds old)'}
     ],
     'responses': {
         200: {'description': 'Paginated user search results'},
-        400: {'description': 'Missing query parameter "q"'}
+        400: {'description': 'Missing query parameter "q" or invalid pagination parameters'}
     }
 })
 def search_users():
@@ -72,10 +79,26 @@ def search_users():
         limit = request.args.get('limit', 20, type=int)
     except ValueError:
         return jsonify({"error": "Invalid pagination parameters"}), 400
+    if page < 1: page = 1
+    if limit < 1 or limit > 100: limit = 20
+
+    count_mode = request.args.get('count')
+    if count_mode not in (None, 'exact', 'cached', 'none'):
+        return jsonify({"error": "Invalid count parameter"}), 400
+
+    if 'cursor' in request.args:
+        try:
+            results = search_service.search_users_after(q, request.args['cursor'], limit)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({
+            "users": dump_user_search(results['users']),
+            "next_cursor": results['next_cursor']
+        }), 200
 
-    results = search_service.search_users(q, page, limit)
+    results = search_service.search_users(q, page, limit, count_mode)
 
-    users_json = user_search_schema.dump(results['users'], many=True)
+    users_json = dump_user_search(results['users'])
     return jsonify({
         "users": users_json,
         "total_count": results['total_count'],
@@ -95,6 +118,7 @@ def search_users():
     ],
     'responses': {
         200: {'description': 'Paginated game search results'},
+        304: {'description': 'Not modified since the ETag in If-None-Match'},
         400: {'description': 'Missing query parameter "q"'},
         500: {'description': 'RAWG API key missing or other internal error'}
     }
@@ -112,7 +136,7 @@ def search_games():
 
     try:
         results_object = search_service.search_games(q, page, limit)
-        return jsonify(results_object), 200
+        return http_cache.public_response(results_object, 'search.games')
 
     except ValueError as e:
         return jsonify({"error": str(e)}), 500
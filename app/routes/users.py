@@ -1,11 +1,11 @@
-from flask import request, jsonify, Blueprint, current_app
+from flask import request, jsonify, Blueprint
 from app.services import user_service
 from app.services import game_service
 from app.services import wishlist_service
 from app.exceptions.exceptions import ValidationException
 from app.schemas.user_schema import user_public_schema
+from app.utils import http_cache
 
-import requests
 from flasgger import swag_from
 
 bp = Blueprint('users', __name__, url_prefix='/users')
@@ -52,7 +52,9 @@ def get_user(username):
     'parameters': [
         {'name': 'username', 'in': 'path', 'required': True, 'schema': {'type': 'string'}},
         {'name': 'page', 'in': 'query', 'required': False, 'schema': {'type': 'integer', 'minimum': 1}},
-        {'name': 'limit', 'in': 'query', 'required': False, 'schema': {'type': 'integer', 'minimum': 1, 'maximum': 100}}
+        {'name': 'limit', 'in': 'query', 'required': False, 'schema': {'type': 'integer', 'minimum': 1, 'maximum': 100}},
+        {'name': 'cursor', 'in': 'query', 'required': False, 'schema': {'type': 'string'},
+         'description': 'Keyset mode: pass an empty value for the first page, then nextCursor. Ignores page.'}
     ],
     'responses': {
         200: {
@@ -65,13 +67,15 @@ def get_user(username):
                                 'games': [
                                     { 'id': 12345, 'name': 'The Game', 'background_image': '...', 'metacritic': 88, 'parent_platforms': ['pc','xbox'] }
                                 ],
-                                'hasNextPage': True
+                                'hasNextPage': True,
+                                'nextCursor': None
                             }
                         }
                     }
                 }
             }
         },
+        304: {'description': 'Wishlist unchanged since the ETag in If-None-Match'},
         404: {'description': 'User not found'},
         500: {'description': 'RAWG API key not configured or fetch error'}
     }
@@ -91,39 +95,17 @@ def get_user_wishlist(username):
         if user is None:
             return jsonify({"error": "User not found"}), 404
 
-        pagination = wishlist_service.get_paginated_wishlist_by_userid(
-            user_id=user.id,
-            page=page,
-            per_page=limit
-        )
-
-        rawg_ids = [item.rawg_game_id for item in pagination.items]
-        has_next_page = pagination.has_next
-
-        games_preview_list = []
-        for game_id in rawg_ids:
-            try:
-                game_preview = game_service.get_game_preview(game_id)
-                games_preview_list.append(game_preview)
+        cursor = request.args.get('cursor')
+        etag = wishlist_service.get_preview_page_etag(user.id, cursor, page, limit)
+        if http_cache.is_not_modified('users.wishlist', etag):
+            return http_cache.not_modified(etag, http_cache.REVALIDATE)
 
-
-            except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 404:
-                    current_app.logger.warning(f"GameID {game_id} (from wishlist) not found in RAWG")
-                else:
-                    current_app.logger.error(f"Failed to fetch game_id {game_id} (HTTPError): {e}")
-                pass
-            except requests.exceptions.RequestException as e:
-                current_app.logger.error(f"Failed to fetch game_id {game_id} (ConnectionError): {e}")
-                pass
-            except Exception as e:
-                current_app.logger.error(f"Failed to process game_id {game_id}: {e}")
-                pass
-
-        return jsonify({
-            "games": games_preview_list,
-            "hasNextPage": has_next_page
-        }), 200
+        preview_page = wishlist_service.get_preview_page(user.id, cursor, page, limit)
+        previews, failed, _ = game_service.resolve_game_previews(
+            preview_page['rawg_ids'], preview_page['catalog_games']
+        )
+        body = wishlist_service.preview_page_body(preview_page, previews)
+        return http_cache.versioned_response(body, etag, complete=not failed), 200
 
     except ValidationException as e:
         return jsonify({"error": e.message}), e.status_code
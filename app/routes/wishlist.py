@@ -2,9 +2,10 @@ from flask import Blueprint, jsonify, current_app, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy.exc import IntegrityError
 from app.exceptions.exceptions import ValidationException
-from app.schemas.wishlist_schema import wishlist_items_schema, wishlist_item_schema
+from app.schemas.wishlist_schema import dump_wishlist_items, wishlist_item_schema
 from app.services import wishlist_service
 from app.extensions import db
+from app.utils import http_cache
 from flasgger import swag_from
 
 bp = Blueprint('wishlist', __name__, url_prefix='/wishlist')
@@ -18,6 +19,13 @@ bp = Blueprint('wishlist', __name__, url_prefix='/wishlist')
         {'bearerAuth': []},
         {'csrfToken': []}
     ],
+    'parameters': [
+        {'name': 'cursor', 'in': 'query', 'required': False, 'schema': {'type': 'string'},
+         'description': 'Keyset mode: pass an empty value for the first page, then next_cursor. '
+                        'Returns {items, next_cursor} instead of the full list.'},
+        {'name': 'limit', 'in': 'query', 'required': False,
+         'schema': {'type': 'integer', 'minimum': 1, 'maximum': 100, 'default': 20}}
+    ],
     'responses': {
         200: {
             'description': 'List of wishlist items',
@@ -29,12 +37,20 @@ bp = Blueprint('wishlist', __name__, url_prefix='/wishlist')
                             'value': [
                                 {"id": 1, "user_id": 7, "rawg_game_id": 12345}
                             ]
+                        },
+                        'keyset': {
+                            'summary': 'Keyset page (cursor given)',
+                            'value': {
+                                'items': [{"id": 1, "user_id": 7, "rawg_game_id": 12345}],
+                                'next_cursor': 'eyJhZGRlZF9vbiI6Ii4uLiIsImlkIjoxfQ'
+                            }
                         }
                     }
                 }
             }
         },
-        400: {'description': 'Invalid user ID'},
+        304: {'description': 'Wishlist unchanged since the ETag in If-None-Match'},
+        400: {'description': 'Invalid user ID or cursor'},
         409: {'description': 'IntegrityError'},
         500: {'description': 'Internal Server Error'}
     }
@@ -42,8 +58,23 @@ bp = Blueprint('wishlist', __name__, url_prefix='/wishlist')
 def get_wishlist():
     user_id = get_jwt_identity()
     try:
-        wishlist = wishlist_service.get_wishlist_by_userid(user_id)
-        return jsonify(wishlist_items_schema.dump(wishlist)), 200
+        limit = request.args.get('limit', 20, type=int)
+        if limit < 1 or limit > 100: limit = 20
+
+        etag = wishlist_service.get_wishlist_etag(user_id, 'items', request.args.get('cursor'), limit)
+        if http_cache.is_not_modified('wishlist', etag):
+            return http_cache.not_modified(etag, http_cache.PRIVATE_REVALIDATE)
+
+        if 'cursor' in request.args:
+            page = wishlist_service.get_wishlist_after(user_id, request.args['cursor'], limit)
+            response = jsonify({
+                "items": dump_wishlist_items(page['items']),
+                "next_cursor": page['next_cursor']
+            })
+        else:
+            wishlist = wishlist_service.get_wishlist_by_userid(user_id)
+            response = jsonify(dump_wishlist_items(wishlist))
+        return http_cache.with_etag(response, etag, http_cache.PRIVATE_REVALIDATE), 200
     except ValidationException as e:
         return jsonify({"error": e.message}), e.status_code
     except IntegrityError as e:
@@ -117,6 +148,129 @@ def add_to_wishlist():
 
 
 
+_BULK_REQUEST_BODY = {
+    'required': True,
+    'content': {
+        'application/json': {
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'rawg_game_ids': {'type': 'array', 'items': {'type': 'integer'}}
+                },
+                'required': ['rawg_game_ids']
+            },
+            'examples': {
+                'example': {
+                    'value': {'rawg_game_ids': [12345, 3498, 4200]}
+                }
+            }
+        }
+    }
+}
+
+
+@bp.route('/bulk', methods=['POST'])
+@jwt_required()
+@swag_from({
+    'tags': ['Wishlist'],
+    'summary': 'Add many games to the current user\'s wishlist in one transaction',
+    'description': 'Ids already on the wishlist are reported as duplicates, not errors. '
+                   'At most WISHLIST_BULK_MAX_IDS ids per request.',
+    'security': [
+        {'bearerAuth': []},
+        {'csrfToken': []}
+    ],
+    'requestBody': _BULK_REQUEST_BODY,
+    'responses': {
+        200: {
+            'description': 'Outcome per id, in request order',
+            'content': {
+                'application/json': {
+                    'examples': {
+                        'example': {
+                            'value': {
+                                'results': [
+                                    {'rawg_game_id': 12345, 'status': 'added'},
+                                    {'rawg_game_id': 3498, 'status': 'duplicate'}
+                                ],
+                                'added': 1,
+                                'timings_ms': {'lookup': 0.8, 'write': 2.1, 'total': 2.9}
+                            }
+                        }
+                    }
+                }
+            }
+        },
+        400: {'description': 'Validation error or too many ids'},
+        409: {'description': 'IntegrityError'},
+        500: {'description': 'Internal Server Error'}
+    }
+})
+def bulk_add_to_wishlist():
+    user_id = get_jwt_identity()
+    data = request.get_json(silent=True)
+    try:
+        return jsonify(wishlist_service.add_games_to_wishlist(user_id, data)), 200
+    except ValidationException as e:
+        return jsonify({"error": e.message}), e.status_code
+    except IntegrityError as e:
+        db.session.rollback()
+        return jsonify({"error": "IntegrityError"}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Internal Server Error"}), 500
+
+
+@bp.route('/bulk', methods=['DELETE'])
+@jwt_required()
+@swag_from({
+    'tags': ['Wishlist'],
+    'summary': 'Remove many games from the current user\'s wishlist in one transaction',
+    'security': [
+        {'bearerAuth': []},
+        {'csrfToken': []}
+    ],
+    'requestBody': _BULK_REQUEST_BODY,
+    'responses': {
+        200: {
+            'description': 'Outcome per id, in request order',
+            'content': {
+                'application/json': {
+                    'examples': {
+                        'example': {
+                            'value': {
+                                'results': [
+                                    {'rawg_game_id': 12345, 'status': 'removed'},
+                                    {'rawg_game_id': 4200, 'status': 'not_found'}
+                                ],
+                                'removed': 1,
+                                'timings_ms': {'lookup': 0.7, 'write': 1.4, 'total': 2.1}
+                            }
+                        }
+                    }
+                }
+            }
+        },
+        400: {'description': 'Validation error or too many ids'},
+        409: {'description': 'IntegrityError'},
+        500: {'description': 'Internal Server Error'}
+    }
+})
+def bulk_delete_from_wishlist():
+    user_id = get_jwt_identity()
+    data = request.get_json(silent=True)
+    try:
+        return jsonify(wishlist_service.delete_games_from_wishlist(user_id, data)), 200
+    except ValidationException as e:
+        return jsonify({"error": e.message}), e.status_code
+    except IntegrityError as e:
+        db.session.rollback()
+        return jsonify({"error": "IntegrityError"}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Internal Server Error"}), 500
+
+
 @bp.route('/<int:rawg_game_id>', methods=['DELETE']) # <-- 1. Принимаем ID из URL
 @jwt_required()
 @swag_from({
@@ -1,5 +1,6 @@
 from app.extensions import ma
 from marshmallow import fields, validate, ValidationError, validates_schema
+from app.utils.fast_dump import compile_dump
 
 class UserSchema(ma.Schema):
 
@@ -79,3 +80,5 @@ user_update_password_schema = UserUpdatePassSchema()
 user_delete_schema = UserDeleteSchema()
 user_public_schema = UserSchema(exclude=("email",))
 user_search_schema = UserSchema(only=("username",))
+
+dump_user_search = compile_dump(user_search_schema, many=True)
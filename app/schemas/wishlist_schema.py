@@ -1,5 +1,6 @@
 from app.extensions import ma
-from marshmallow import fields
+from marshmallow import fields, validate
+from app.utils.fast_dump import compile_dump
 
 class WishlistSchema(ma.Schema):
     id = fields.Int(dump_only=True)
@@ -7,5 +8,11 @@ class WishlistSchema(ma.Schema):
     rawg_game_id = fields.Int(required=True)
     added_on = fields.DateTime(dump_only=True)
 
+class WishlistBulkSchema(ma.Schema):
+    rawg_game_ids = fields.List(fields.Int(strict=True, validate=validate.Range(min=1)), required=True, validate=validate.Length(min=1))
+
 wishlist_items_schema = WishlistSchema(many=True)
-wishlist_item_schema = WishlistSchema()
\ No newline at end of file
+wishlist_item_schema = WishlistSchema()
+wishlist_bulk_schema = WishlistBulkSchema()
+
+dump_wishlist_items = compile_dump(wishlist_items_schema)
@@ -0,0 +1,120 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import defer
+
+from app.extensions import db
+from app.models import Game
+from app.utils import rate_budget
+from app.utils.transformers import transform_rawg_game_preview, transform_rawg_game_details
+
+_refresh_executor = None
+_refresh_lock = threading.Lock()
+_refresh_in_flight = set()
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _as_naive_utc(value):
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def is_stale(game):
+    max_age = timedelta(seconds=current_app.config['GAME_CATALOG_TTL'])
+    return _utcnow() - _as_naive_utc(game.fetched_at) > max_age
+
+
+def get_game(game_id):
+    try:
+        return db.session.get(Game, game_id)
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        current_app.logger.error(f"Game catalog lookup failed for game_id {game_id}: {e}")
+        return None
+
+
+def get_games(game_ids):
+    if not game_ids:
+        return {}
+    try:
+        games = Game.query.options(defer(Game.description)).filter(Game.id.in_(game_ids)).all()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        current_app.logger.error(f"Game catalog lookup failed: {e}")
+        return {}
+    return {game.id: game for game in games}
+
+
+def _apply_rawg_payload(game, raw_game):
+    preview = transform_rawg_game_preview(raw_game)
+    details = transform_rawg_game_details(raw_game)
+
+    game.name = preview['name']
+    game.background_image = preview['background_image']
+    game.metacritic = preview['metacritic']
+    game.parent_platforms = preview['parent_platforms']
+    game.description = details['description']
+    game.released = details['released']
+    game.website = details['website']
+    game.genres = details['genres']
+    game.platforms = details['platforms']
+    game.fetched_at = _utcnow()
+    return game
+
+
+def save_game(raw_game):
+    game_id = raw_game.get('id')
+    try:
+        game = db.session.get(Game, game_id) or Game(id=game_id)
+        _apply_rawg_payload(game, raw_game)
+        db.session.add(game)
+        db.session.commit()
+        return game
+    except SQLAlchemyError as e:
+        # Another worker may have inserted the same game first; the payload
+        # is still served from memory and the row is written next time.
+        db.session.rollback()
+        current_app.logger.warning(f"Failed to store game_id {game_id} in catalog: {e}")
+        return _apply_rawg_payload(Game(id=game_id), raw_game)
+
+
+def _get_refresh_executor():
+    global _refresh_executor
+    if _refresh_executor is None:
+        with _refresh_lock:
+            if _refresh_executor is None:
+                _refresh_executor = ThreadPoolExecutor(
+                    max_workers=current_app.config['GAME_CATALOG_REFRESH_WORKERS'],
+                    thread_name_prefix='catalog-refresh'
+                )
+    return _refresh_executor
+
+
+def _refresh_game(app, game_id, refresh):
+    try:
+        with app.app_context(), rate_budget.background():
+            try:
+                refresh(game_id)
+            except Exception as e:
+                current_app.logger.warning(f"Background refresh of game_id {game_id} failed: {e}")
+    finally:
+        with _refresh_lock:
+            _refresh_in_flight.discard(game_id)
+
+
+def schedule_refresh(game_ids, refresh):
+    app = current_app._get_current_object()
+    executor = _get_refresh_executor()
+    for game_id in game_ids:
+        with _refresh_lock:
+            if game_id in _refresh_in_flight:
+                continue
+            _refresh_in_flight.add(game_id)
+        executor.submit(_refresh_game, app, game_id, refresh)
@@ -0,0 +1,161 @@
+import bisect
+import os
+import re
+import threading
+import time
+import unicodedata
+
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.extensions import db
+from app.models import Game
+
+# Per-worker inverted index over the names of the games in the catalog. It is
+# rebuilt from the games table in a background thread every
+# GAME_INDEX_REFRESH_INTERVAL seconds and extended in place whenever this
+# worker stores a game fetched from RAWG. The catalog only holds games users
+# have viewed or wishlisted, so a query is answered from it only when its
+# matches cover the result count RAWG last reported for that query and fit
+# on the first page; otherwise the caller goes to RAWG. Such a result has no
+# second page, so a listing never mixes the local ranking with RAWG's
+# ordering. Writers take _lock; searches read the index without it.
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+_lock = threading.Lock()
+_index = None
+_building_pid = None
+
+
+def tokenize(text):
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii')
+    return _TOKEN_RE.findall(text.lower())
+
+
+class _Index:
+
+    def __init__(self):
+        self.postings = {}
+        self.tokens = []
+        self.games = {}
+        self.built_at = time.monotonic()
+
+    def add(self, preview):
+        # The game is stored before its id is posted, so a concurrent search
+        # never finds an id it cannot look up.
+        game_id = preview['id']
+        name_tokens = tokenize(preview['name'])
+        self.games[game_id] = (preview, name_tokens, ' '.join(name_tokens))
+        for token in set(name_tokens):
+            ids = self.postings.get(token)
+            if ids is None:
+                self.postings[token] = ids = set()
+                bisect.insort(self.tokens, token)
+            ids.add(game_id)
+
+    def _matching(self, prefix):
+        # Ids of games with a name token starting with `prefix`.
+        ids = set()
+        start = bisect.bisect_left(self.tokens, prefix)
+        for token in self.tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            ids |= self.postings[token]
+        return ids
+
+    def _score(self, game_id, query_tokens, query):
+        preview, name_tokens, name = self.games[game_id]
+        score = 0
+        if name == query:
+            score += 100
+        elif name.startswith(query):
+            score += 50
+        for token in query_tokens:
+            score += 10 if token in name_tokens else 5
+        # Shorter names are the closer match; metacritic breaks ties.
+        return score - len(name_tokens), preview['metacritic'] or 0
+
+    def search(self, query_tokens):
+        candidates = None
+        for token in query_tokens:
+            ids = self._matching(token)
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return []
+        query = ' '.join(query_tokens)
+        ranked = sorted(candidates, key=lambda game_id: self._score(game_id, query_tokens, query), reverse=True)
+        return [self.games[game_id][0] for game_id in ranked]
+
+
+def _build(app):
+    global _index, _building_pid
+    try:
+        with app.app_context():
+            start = time.perf_counter()
+            index = _Index()
+            rows = db.session.query(
+                Game.id, Game.name, Game.background_image, Game.metacritic, Game.parent_platforms
+            ).yield_per(1000)
+            for game_id, name, background_image, metacritic, parent_platforms in rows:
+                index.add({
+                    'id': game_id,
+                    'name': name,
+                    'background_image': background_image,
+                    'metacritic': metacritic,
+                    'parent_platforms': parent_platforms or []
+                })
+            with _lock:
+                _index = index
+            current_app.logger.info(
+                f"Game search index built: {len(index.games)} games in {time.perf_counter() - start:.2f}s"
+            )
+    except SQLAlchemyError as e:
+        app.logger.warning(f"Game search index build failed: {e}")
+    finally:
+        with _lock:
+            _building_pid = None
+
+
+def _current_index():
+    # Returns the index (None until the first build finishes) and starts a
+    # rebuild in the background when it is missing or too old.
+    global _building_pid
+    pid = os.getpid()
+    with _lock:
+        index = _index
+        expired = index is None or time.monotonic() - index.built_at > current_app.config['GAME_INDEX_REFRESH_INTERVAL']
+        if not expired or _building_pid == pid:
+            return index
+        _building_pid = pid
+
+    app = current_app._get_current_object()
+    threading.Thread(target=_build, args=(app,), name='game-index', daemon=True).start()
+    return index
+
+
+def add(game):
+    with _lock:
+        if _index is not None:
+            _index.add(game.to_preview())
+
+
+def search(q, page, limit, upstream_count=None):
+    # A page of previews when the query is served by the index, otherwise
+    # None. upstream_count is RAWG's result count for the query, None when
+    # it is not known.
+    if not current_app.config['GAME_INDEX_ENABLED'] or len(q) < current_app.config['GAME_INDEX_MIN_QUERY_LENGTH']:
+        return None
+    if page > 1 or upstream_count is None or upstream_count > limit:
+        return None
+    index = _current_index()
+    query_tokens = tokenize(q)
+    if index is None or not query_tokens:
+        return None
+
+    matches = index.search(query_tokens)
+    if not upstream_count <= len(matches) <= limit:
+        return None
+    return {
+        "games": matches,
+        "nextPage": None
+    }
@@ -1,32 +1,59 @@
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
 import requests
 from flask import current_app
 from app.extensions import cache
-from app.utils.transformers import transform_rawg_game_preview, transform_rawg_game_details
-
-@cache.memoize(timeout=1200)
-def get_trending_games(page=1, ordering='-relevance', platform_id=None):
+from app.services import rawg_client, rawg_async_client, catalog_service, game_index
+from app.utils import body_cache, cache_codec, http_cache, metrics, single_flight
+from app.utils.caching import cached
+from app.utils.transformers import transform_rawg_game_preview
 
-    api_key = current_app.config.get('RAWG_API_KEY')
-    if not api_key:
-        raise ValueError("RAWG API key is not configured")
+PREVIEW_CACHE_KEY = 'game:preview:{}'
+DETAILS_CACHE_KEY = 'game:details:{}'
+NOT_FOUND_CACHE_KEY = 'game:missing:{}'
 
-    if page < 1:
-        page = 1
+DEFAULT_TRENDING_ORDERING = '-relevance'
+TRENDING_ORDERINGS = frozenset(
+    prefix + field
+    for field in ('name', 'released', 'added', 'created', 'updated', 'rating', 'metacritic')
+    for prefix in ('', '-')
+) | {DEFAULT_TRENDING_ORDERING}
 
+def _trending_params(page, ordering, platform_id):
     params = {
-        'key': api_key,
         'page_size': 24,
         'page': page,
         'ordering': ordering
     }
     if platform_id:
         params['platforms'] = platform_id
+    return params
+
+
+def canonical_platform_ids(platform_id):
+    # RAWG takes one platform id or a comma-separated list: " 187,4,4" and
+    # "4,187" are one filter, empty means all platforms. Anything else raises
+    # ValueError rather than silently widening the query to all platforms.
+    parts = [part.strip() for part in str(platform_id or '').split(',') if part.strip()]
+    if not all(part.isdigit() and int(part) > 0 for part in parts):
+        raise ValueError("Invalid platform")
+    return ','.join(str(part) for part in sorted({int(part) for part in parts})) or None
+
 
+def canonical_trending_args(page=1, ordering=DEFAULT_TRENDING_ORDERING, platform_id=None):
+    # Unknown orderings fall back to the default so junk orderings share
+    # one entry; platform lists are sorted and deduplicated.
+    page = max(int(page or 1), 1)
+    ordering = (ordering or '').strip().lower()
+    if ordering not in TRENDING_ORDERINGS:
+        ordering = DEFAULT_TRENDING_ORDERING
+    return page, ordering, canonical_platform_ids(platform_id)
 
-    response = requests.get('https://api.rawg.io/api/games', params=params, timeout=10)
-    response.raise_for_status()
 
-    raw_data = response.json()
+def _trending_result(raw_data, page):
     games = [transform_rawg_game_preview(game) for game in raw_data.get('results', [])]
     has_next_page = raw_data.get('next') is not None
 
@@ -35,26 +62,343 @@ def get_trending_games(page=1, ordering='-relevance', platform_id=None):
         'nextPage': page + 1 if has_next_page else None
     }
 
-@cache.memoize(timeout=86400)
+@cached('trending', timeout=1200, hard_timeout=7200, normalize=canonical_trending_args, admission=True)
+def get_trending_games(page=1, ordering=DEFAULT_TRENDING_ORDERING, platform_id=None):
+    raw_data = rawg_client.get_json('games', '/games', params=_trending_params(page, ordering, platform_id))
+    return _trending_result(raw_data, page)
+
+
+def prefetch_next_trending_page(data, ordering=DEFAULT_TRENDING_ORDERING, platform_id=None):
+    # Infinite scroll asks for nextPage right after this one; fetching it in
+    # the background turns that request into a cache hit.
+    next_page = data.get('nextPage')
+    if not current_app.config['TRENDING_PREFETCH_ENABLED'] or not next_page:
+        return False
+    if next_page > current_app.config['TRENDING_PREFETCH_MAX_PAGE']:
+        return False
+    return get_trending_games.prefetch(next_page, ordering, platform_id)
+
+
+async def get_trending_games_async(page=1, ordering=DEFAULT_TRENDING_ORDERING, platform_id=None):
+    page, ordering, platform_id = canonical_trending_args(page, ordering, platform_id)
+    data = get_trending_games.peek(page, ordering, platform_id)
+    if data is not None:
+        return data
+
+    try:
+        raw_data = await rawg_async_client.get_json(
+            'games', '/games', params=_trending_params(page, ordering, platform_id)
+        )
+    except requests.exceptions.RequestException:
+        data = get_trending_games.last_known(page, ordering, platform_id)
+        if data is None:
+            raise
+        return data
+    data = _trending_result(raw_data, page)
+    get_trending_games.store(data, page, ordering, platform_id)
+    return data
+
 def _fetch_rawg_details_sync(game_id):
-    api_key = current_app.config.get('RAWG_API_KEY')
-    if not api_key:
-        raise ValueError("RAWG API key is not configured")
+    try:
+        return rawg_client.get_json('game_details', f'/games/{game_id}')
+    except requests.exceptions.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            _store_not_found(game_id)
+        raise
 
-    url = f'https://api.rawg.io/api/games/{game_id}'
-    params = {'key': api_key}
 
-    response = requests.get(url, params=params, timeout=10)
-    response.raise_for_status()
+def _store_not_found(game_id):
+    try:
+        cache.set(NOT_FOUND_CACHE_KEY.format(game_id), 1, timeout=current_app.config['GAME_NOT_FOUND_TTL'])
+        metrics.incr('cache.game.tombstones_stored')
+    except Exception as e:
+        current_app.logger.warning(f"Failed to cache not-found marker for game_id {game_id}: {e}")
 
-    return response.json()
 
-def get_game_details(game_id):
-    raw_data = _fetch_rawg_details_sync(game_id)
-    return transform_rawg_game_details(raw_data)
+def _raise_if_known_missing(game_id):
+    try:
+        missing = cache.get(NOT_FOUND_CACHE_KEY.format(game_id))
+    except Exception as e:
+        current_app.logger.warning(f"Not-found marker lookup failed for game_id {game_id}: {e}")
+        return
+    if missing:
+        metrics.incr('cache.game.tombstone_hits')
+        raise rawg_client.not_found_error(f'/games/{game_id}')
+
+
+def _blob_etag(blob):
+    # ETag of a projection: the hash of its cache blob, known on a cache hit
+    # without serializing and when the projection is built from the catalog.
+    return hashlib.sha1(blob).hexdigest()
+
+
+def _cache_projections(game):
+    # Only the two projections are cached, never the raw RAWG payload with
+    # its stores, tags and ratings. Returns them by key template, with the
+    # ETag a later cache hit will have.
+    projections = {PREVIEW_CACHE_KEY: game.to_preview(), DETAILS_CACHE_KEY: game.to_details()}
+    blobs = {
+        PREVIEW_CACHE_KEY: cache_codec.encode('game_preview', projections[PREVIEW_CACHE_KEY]),
+        DETAILS_CACHE_KEY: cache_codec.encode('game_details', projections[DETAILS_CACHE_KEY])
+    }
+    for key_template, blob in blobs.items():
+        http_cache.remember(projections[key_template], _blob_etag(blob))
+    try:
+        cache.set_many(
+            {key_template.format(game.id): blob for key_template, blob in blobs.items()},
+            timeout=current_app.config['GAME_PROJECTION_CACHE_TIMEOUT']
+        )
+    except Exception as e:
+        current_app.logger.warning(f"Failed to cache projections for game_id {game.id}: {e}")
+    body_cache.invalidate(DETAILS_CACHE_KEY.format(game.id))
+    return projections
+
 
+def _get_cached_projections(key_template, game_ids):
+    try:
+        blobs = cache.get_many(*[key_template.format(game_id) for game_id in game_ids])
+    except Exception as e:
+        current_app.logger.warning(f"Game projection cache lookup failed: {e}")
+        return {}
+    projections = {}
+    for game_id, blob in zip(game_ids, blobs):
+        value = cache_codec.decode(blob)
+        if value is not None:
+            projections[game_id] = value
+            http_cache.remember(value, _blob_etag(blob))
+    return projections
+
+
+def _store_fetched_game(raw_game):
+    game = catalog_service.save_game(raw_game)
+    projections = _cache_projections(game)
+    game_index.add(game)
+    return projections
+
+
+def _refresh_game(game_id):
+    _store_fetched_game(_fetch_rawg_details_sync(game_id))
+
+
+def _get_catalog_projections(game_id):
+    game = catalog_service.get_game(game_id)
+    if game is None:
+        return _store_fetched_game(_fetch_rawg_details_sync(game_id))
+
+    if catalog_service.is_stale(game):
+        catalog_service.schedule_refresh([game_id], _refresh_game)
+    return _cache_projections(game)
+
+def _poll_projection(key_template, game_id):
+    # The cached projection, None when it is not cached yet, or the 404 of a
+    # game known to be missing.
+    projection = _get_cached_projections(key_template, [game_id]).get(game_id)
+    if projection is None:
+        _raise_if_known_missing(game_id)
+    return projection
+
+
+def _load_projection(key_template, game_id):
+    projection = _poll_projection(key_template, game_id)
+    if projection is not None:
+        return projection
+
+    return single_flight.run(
+        f"game:{game_id}",
+        compute=lambda: _get_catalog_projections(game_id)[key_template],
+        poll=lambda: _poll_projection(key_template, game_id)
+    )
+
+def get_game_details(game_id):
+    return _load_projection(DETAILS_CACHE_KEY, game_id)
 
 
 def get_game_preview(game_id):
-    raw_data = _fetch_rawg_details_sync(game_id)
-    return transform_rawg_game_preview(raw_data)
\ No newline at end of file
+    return _load_projection(PREVIEW_CACHE_KEY, game_id)
+
+
+def warm_game_projections(game_id):
+    # Returns the number of cache keys written (0 when already cached).
+    if game_id in _get_cached_projections(PREVIEW_CACHE_KEY, [game_id]):
+        return 0
+    _get_catalog_projections(game_id)
+    return 2
+
+
+_preview_executor = None
+_preview_executor_lock = threading.Lock()
+
+
+def _get_preview_executor():
+    global _preview_executor
+    if _preview_executor is None:
+        with _preview_executor_lock:
+            if _preview_executor is None:
+                _preview_executor = ThreadPoolExecutor(
+                    max_workers=current_app.config['GAME_PREVIEW_MAX_WORKERS'],
+                    thread_name_prefix='game-preview'
+                )
+    return _preview_executor
+
+
+def _is_not_found(e):
+    # A RAWG 404, or a cached tombstone raised as one.
+    return isinstance(e, requests.exceptions.HTTPError) and e.response is not None and e.response.status_code == 404
+
+
+def _log_preview_failure(game_id, e):
+    if isinstance(e, requests.exceptions.HTTPError):
+        if _is_not_found(e):
+            current_app.logger.warning(f"GameID {game_id} not found in RAWG")
+        else:
+            current_app.logger.error(f"Failed to fetch game_id {game_id} (HTTPError): {e}")
+    elif isinstance(e, requests.exceptions.RequestException):
+        current_app.logger.error(f"Failed to fetch game_id {game_id} (ConnectionError): {e}")
+    else:
+        current_app.logger.error(f"Failed to process game_id {game_id}: {e}")
+
+
+def _fetch_preview_in_context(app, game_id):
+    with app.app_context():
+        return get_game_preview(game_id)
+
+
+def _get_cached_previews(game_ids):
+    # Previews and not-found markers of all ids in a single multi-get.
+    preview_keys = [PREVIEW_CACHE_KEY.format(game_id) for game_id in game_ids]
+    missing_keys = [NOT_FOUND_CACHE_KEY.format(game_id) for game_id in game_ids]
+    try:
+        values = cache.get_many(*preview_keys, *missing_keys)
+    except Exception as e:
+        current_app.logger.warning(f"Game projection cache lookup failed: {e}")
+        return {}, set()
+
+    previews = {}
+    known_missing = set()
+    for game_id, blob, missing in zip(game_ids, values[:len(game_ids)], values[len(game_ids):]):
+        preview = cache_codec.decode(blob)
+        if preview is not None:
+            previews[game_id] = preview
+        elif missing:
+            known_missing.add(game_id)
+    if known_missing:
+        metrics.incr('cache.game.tombstone_hits', len(known_missing))
+    return previews, known_missing
+
+
+def _resolve_local_previews(unique_ids, catalog_games):
+    # Catalog rows already joined by the caller are used as is; otherwise
+    # previews come from one cache multi-get and one catalog IN query.
+    # Returns the previews found, the ids that still need RAWG and the ids
+    # known to be missing from RAWG.
+    previews = {}
+    known_missing = set()
+    if catalog_games is None:
+        previews, known_missing = _get_cached_previews(unique_ids)
+        catalog_games = catalog_service.get_games(
+            [game_id for game_id in unique_ids if game_id not in previews and game_id not in known_missing]
+        )
+
+    stale_ids = []
+    for game_id, game in catalog_games.items():
+        if game is None:
+            continue
+        previews[game_id] = game.to_preview()
+        if catalog_service.is_stale(game):
+            stale_ids.append(game_id)
+    if stale_ids:
+        catalog_service.schedule_refresh(stale_ids, _refresh_game)
+
+    misses = [game_id for game_id in unique_ids if game_id not in previews and game_id not in known_missing]
+    return previews, misses, known_missing
+
+
+def _unresolved(unique_ids, previews, not_found):
+    return [game_id for game_id in unique_ids if game_id not in previews and game_id not in not_found]
+
+
+def resolve_game_previews(game_ids, catalog_games=None):
+    # Misses are fetched concurrently under an overall deadline. Returns the
+    # previews by id, the ids that failed or missed the deadline, and the
+    # ids RAWG does not know (a 404 or a cached tombstone).
+    unique_ids = list(dict.fromkeys(game_ids))
+    previews, misses, not_found = _resolve_local_previews(unique_ids, catalog_games)
+
+    if misses:
+        app = current_app._get_current_object()
+        executor = _get_preview_executor()
+        futures = {executor.submit(_fetch_preview_in_context, app, game_id): game_id for game_id in misses}
+        done, not_done = wait(futures, timeout=current_app.config['GAME_PREVIEW_DEADLINE'])
+
+        for future in done:
+            game_id = futures[future]
+            try:
+                previews[game_id] = future.result()
+            except Exception as e:
+                _log_preview_failure(game_id, e)
+                if _is_not_found(e):
+                    not_found.add(game_id)
+
+        for future in not_done:
+            future.cancel()
+            current_app.logger.error(f"Failed to fetch game_id {futures[future]}: deadline exceeded")
+
+    return previews, _unresolved(unique_ids, previews, not_found), not_found
+
+
+def _store_fetched_preview_in_context(app, raw_game):
+    # Own app context, hence own database session, per storing thread.
+    with app.app_context():
+        return _store_fetched_game(raw_game)[PREVIEW_CACHE_KEY]
+
+
+async def _fetch_preview_async(app, game_id, semaphore):
+    # get_game_preview for the event loop: the same cache lookup, tombstone
+    # and single flight, with the Redis and database calls run in threads.
+    preview = await asyncio.to_thread(_poll_projection, PREVIEW_CACHE_KEY, game_id)
+    if preview is not None:
+        return preview
+
+    async def compute():
+        async with semaphore:
+            try:
+                raw_game = await rawg_async_client.get_json('game_details', f'/games/{game_id}')
+            except requests.exceptions.HTTPError as e:
+                if e.response is not None and e.response.status_code == 404:
+                    await asyncio.to_thread(_store_not_found, game_id)
+                raise
+        return await asyncio.to_thread(_store_fetched_preview_in_context, app, raw_game)
+
+    return await single_flight.run_async(
+        f"game:{game_id}",
+        compute=compute,
+        poll=lambda: _poll_projection(PREVIEW_CACHE_KEY, game_id)
+    )
+
+
+async def resolve_game_previews_async(game_ids, catalog_games=None):
+    # Same contract as resolve_game_previews, with the misses fetched as
+    # concurrent coroutines on one connection pool instead of threads.
+    unique_ids = list(dict.fromkeys(game_ids))
+    previews, misses, not_found = _resolve_local_previews(unique_ids, catalog_games)
+
+    if misses:
+        app = current_app._get_current_object()
+        semaphore = asyncio.Semaphore(current_app.config['GAME_PREVIEW_ASYNC_CONCURRENCY'])
+        tasks = {asyncio.ensure_future(_fetch_preview_async(app, game_id, semaphore)): game_id for game_id in misses}
+        done, pending = await asyncio.wait(tasks, timeout=current_app.config['GAME_PREVIEW_DEADLINE'])
+
+        for task in done:
+            game_id = tasks[task]
+            try:
+                previews[game_id] = task.result()
+            except Exception as e:
+                _log_preview_failure(game_id, e)
+                if _is_not_found(e):
+                    not_found.add(game_id)
+
+        for task in pending:
+            task.cancel()
+            current_app.logger.error(f"Failed to fetch game_id {tasks[task]}: deadline exceeded")
+
+    return previews, _unresolved(unique_ids, previews, not_found), not_found
@@ -0,0 +1,116 @@
+import asyncio
+import contextvars
+import random
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import requests
+from flask import current_app
+
+from app.services import rawg_client
+from app.utils import metrics
+
+# httpx clients are bound to the event loop they were opened on, and Flask
+# runs every async view on its own loop. A client is therefore opened per
+# request (open_client) and shared by all upstream calls made inside it.
+_current_client = contextvars.ContextVar('rawg_async_client', default=None)
+
+
+@asynccontextmanager
+async def open_client():
+    config = current_app.config
+    client = httpx.AsyncClient(
+        base_url=rawg_client.RAWG_API_URL,
+        headers={'User-Agent': 'GameTrackr-api'},
+        limits=httpx.Limits(
+            max_connections=config['RAWG_ASYNC_MAX_CONNECTIONS'],
+            max_keepalive_connections=config['RAWG_POOL_MAXSIZE']
+        ),
+        timeout=httpx.Timeout(config['RAWG_READ_TIMEOUT'], connect=config['RAWG_CONNECT_TIMEOUT'])
+    )
+    token = _current_client.set(client)
+    try:
+        yield client
+    finally:
+        _current_client.reset(token)
+        await client.aclose()
+
+
+def _as_requests_error(e, url):
+    # Callers share one error vocabulary with the sync client.
+    if isinstance(e, httpx.TimeoutException):
+        return requests.exceptions.Timeout(str(e))
+    return requests.exceptions.ConnectionError(f"{e.__class__.__name__}: {e} ({url})")
+
+
+def _raise_for_status(response):
+    if response.status_code < 400:
+        return
+    wrapped = requests.Response()
+    wrapped.status_code = response.status_code
+    wrapped.url = str(response.url.copy_remove_param('key'))
+    wrapped.reason = response.reason_phrase
+    kind = 'Client' if response.status_code < 500 else 'Server'
+    raise requests.exceptions.HTTPError(
+        f"{response.status_code} {kind} Error: {response.reason_phrase} for url: {wrapped.url}",
+        response=wrapped
+    )
+
+
+def _backoff(attempt):
+    config = current_app.config
+    delay = config['RAWG_RETRY_BACKOFF'] * (2 ** attempt) + random.uniform(0, config['RAWG_RETRY_JITTER'])
+    return min(delay, config['RAWG_RETRY_BACKOFF_MAX'])
+
+
+async def _send(client, endpoint, path, query, timeout):
+    retries = current_app.config['RAWG_MAX_RETRIES']
+    attempt = 0
+    while True:
+        status = 'error'
+        start = time.perf_counter()
+        try:
+            response = await client.get(path, params=query, timeout=timeout)
+            status = response.status_code
+            metrics.incr(f"rawg.{endpoint}.bytes", len(response.content))
+        except httpx.RequestError as e:
+            if attempt >= retries:
+                raise _as_requests_error(e, path) from e
+        finally:
+            rawg_client.record_call(endpoint, status, time.perf_counter() - start)
+
+        if status != 'error' and (status not in rawg_client.RETRY_STATUSES or attempt >= retries):
+            return response
+
+        await asyncio.sleep(_backoff(attempt))
+        attempt += 1
+
+
+async def get_json(endpoint, path, params=None, timeout=None):
+    query = dict(params or {})
+    query['key'] = rawg_client.get_api_key()
+    if timeout is None:
+        timeout = current_app.config['RAWG_READ_TIMEOUT']
+    request_timeout = httpx.Timeout(timeout, connect=current_app.config['RAWG_CONNECT_TIMEOUT'])
+
+    # The breaker and the rate budget live in Redis; their round trips run in
+    # a thread so they do not stall the other calls on this event loop.
+    probe = await asyncio.to_thread(rawg_client.admit)
+    status = 'error'
+    start = time.perf_counter()
+    try:
+        client = _current_client.get()
+        if client is None:
+            async with open_client() as client:
+                response = await _send(client, endpoint, path, query, request_timeout)
+        else:
+            response = await _send(client, endpoint, path, query, request_timeout)
+        status = response.status_code
+    finally:
+        await asyncio.to_thread(
+            rawg_client.breaker.record, not rawg_client.is_upstream_failure(status), time.perf_counter() - start, probe
+        )
+
+    _raise_for_status(response)
+    return response.json()
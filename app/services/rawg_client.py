@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.utils import metrics, rate_budget
+from app.utils.circuit_breaker import CircuitBreaker
+
+RAWG_API_URL = "https://api.rawg.io/api"
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+breaker = CircuitBreaker('rawg')
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def _build_session(config):
+    retry = Retry(
+        total=config['RAWG_MAX_RETRIES'],
+        backoff_factor=config['RAWG_RETRY_BACKOFF'],
+        backoff_jitter=config['RAWG_RETRY_JITTER'],
+        backoff_max=config['RAWG_RETRY_BACKOFF_MAX'],
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET']),
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=config['RAWG_POOL_MAXSIZE'],
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['User-Agent'] = 'GameTrackr-api'
+    return session
+
+
+def get_session():
+    # One pool per worker process: a session inherited through fork would
+    # share sockets with the parent, so it is rebuilt when the pid changes.
+    global _session, _session_pid
+
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = _build_session(current_app.config)
+                _session_pid = pid
+    return _session
+
+
+def get_api_key():
+    api_key = current_app.config.get('RAWG_API_KEY')
+    if not api_key:
+        current_app.logger.error("RAWG API key is not configured")
+        raise ValueError("RAWG API key is not configured")
+    return api_key
+
+
+def record_call(endpoint, status, elapsed):
+    metrics.observe(f"rawg.{endpoint}.latency_ms", elapsed * 1000)
+    metrics.incr(f"rawg.{endpoint}.status.{status}")
+
+
+def is_upstream_failure(status):
+    # Statuses that count against the circuit breaker; a 404 is an answer.
+    return status == 'error' or status in RETRY_STATUSES
+
+
+def admit():
+    # Checks the circuit first so an open circuit does not spend the rate
+    # budget; returns whether the call is the breaker's half-open probe.
+    probe = breaker.before_call()
+    try:
+        rate_budget.acquire()
+    except rate_budget.RateBudgetExceeded:
+        if probe:
+            breaker.release_probe()
+        raise
+    return probe
+
+
+def get(endpoint, path, params=None, timeout=None):
+    query = dict(params or {})
+    query['key'] = get_api_key()
+
+    if timeout is None:
+        timeout = current_app.config['RAWG_READ_TIMEOUT']
+    timeouts = (current_app.config['RAWG_CONNECT_TIMEOUT'], timeout)
+
+    probe = admit()
+    status = 'error'
+    start = time.perf_counter()
+    try:
+        response = get_session().get(f"{RAWG_API_URL}{path}", params=query, timeout=timeouts)
+        status = response.status_code
+        metrics.incr(f"rawg.{endpoint}.bytes", len(response.content))
+    finally:
+        elapsed = time.perf_counter() - start
+        record_call(endpoint, status, elapsed)
+        breaker.record(not is_upstream_failure(status), elapsed, probe)
+
+    response.raise_for_status()
+    return response
+
+
+def not_found_error(path):
+    # Stand-in for a RAWG 404 answered from a cached tombstone, shaped like
+    # the HTTPError raised by raise_for_status() so callers handle both alike.
+    response = requests.Response()
+    response.status_code = 404
+    response.url = f"{RAWG_API_URL}{path}"
+    return requests.exceptions.HTTPError(f"404 Client Error: Not Found (cached) for url: {response.url}", response=response)
+
+
+def get_json(endpoint, path, params=None, timeout=None):
+    return get(endpoint, path, params=params, timeout=timeout).json()
@@ -1,91 +1,397 @@
-import requests
-from requests import RequestException
-from app.extensions import cache
+import asyncio
+import math
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from requests import RequestException, HTTPError
+from sqlalchemy import func
+from app.extensions import cache, db
 from app.models.user import User
+from app.models.username_trigram import UsernameTrigram, trigrams
+from app.services import game_index, rawg_client, rawg_async_client
 from flask import current_app
+from app.utils import http_cache, metrics
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.utils.caching import cached
 from app.utils.transformers import transform_rawg_game_preview
 
-RAWG_API_URL = "https://api.rawg.io/api"
+_path_lock = threading.Lock()
+_path_counts = Counter()
 
-@cache.memoize(timeout=1200)
-def search_games(q, page=1, limit=10):
-    api_key = current_app.config.get('RAWG_API_KEY')
-    if not api_key:
-        current_app.logger.error("RAWG API key is not configured")
-        raise ValueError("RAWG API key is not configured")
+_search_executor = None
+_search_executor_lock = threading.Lock()
 
-    params = {
-        'key': api_key,
+def _search_params(q, page, limit):
+    return {
         'search': q,
         'page': page,
         'ordering': '-added',
         'page_size': limit
     }
 
+
+def canonical_search_args(q, page=1, limit=10):
+    # "Zelda", " zelda " and "ZELDA" are one search; limits outside the
+    # allowed range are clamped rather than cached separately.
+    q = ' '.join((q or '').split()).lower()
+    page = max(int(page or 1), 1)
+    limit = min(max(int(limit or 1), 1), current_app.config['SEARCH_GAMES_MAX_LIMIT'])
+    return q, page, limit
+
+
+def _search_result(data, page):
+    raw_games = data.get('results', [])
+    transformed_games = [transform_rawg_game_preview(game) for game in raw_games]
+    has_next_page = data.get('next') is not None
+
+    return {
+        "games": transformed_games,
+        "nextPage": page + 1 if has_next_page else None
+    }
+
+
+def _upstream_count_key(q):
+    return f"search:count:{q}"
+
+
+def _store_upstream_count(q, data):
+    # RAWG's total for the query, which decides whether the local index
+    # holds the complete result.
+    count = data.get('count')
+    if not isinstance(count, int):
+        return
     try:
-        response = requests.get(
-            f"{RAWG_API_URL}/games",
-            params=params,
-            timeout=5
-        )
-        response.raise_for_status()
+        cache.set(_upstream_count_key(q), count, timeout=current_app.config['GAME_INDEX_UPSTREAM_COUNT_TTL'])
+    except Exception as e:
+        current_app.logger.warning(f"Failed to cache the RAWG result count for q={q}: {e}")
 
-        if response.status_code == 404:
+
+def _get_upstream_count(q):
+    if not current_app.config['GAME_INDEX_ENABLED']:
+        return None
+    try:
+        return cache.get(_upstream_count_key(q))
+    except Exception as e:
+        current_app.logger.warning(f"RAWG result count lookup failed for q={q}: {e}")
+        return None
+
+
+def _is_not_found(e):
+    # RAWG answers 404 for pages past the last one: a confirmed empty
+    # result that is safe to cache.
+    return e.response is not None and e.response.status_code == 404
+
+
+@cached('search_games', timeout=1200, hard_timeout=3600, normalize=canonical_search_args, admission=True)
+def _search_games_upstream(q, page=1, limit=10):
+    try:
+        response = rawg_client.get(
+            'search',
+            '/games',
+            params=_search_params(q, page, limit),
+            timeout=current_app.config['RAWG_SEARCH_TIMEOUT']
+        )
+    except HTTPError as e:
+        if _is_not_found(e):
             return {"games": [], "nextPage": None}
+        raise
 
-        data = response.json()
-        raw_games = data.get('results', [])
-        transformed_games = [transform_rawg_game_preview(game) for game in raw_games]
-        has_next_page = data.get('next') is not None
+    data = response.json()
+    _store_upstream_count(q, data)
+    return _search_result(data, page)
 
-        return {
-            "games": transformed_games,
-            "nextPage": page + 1 if has_next_page else None
-        }
 
+def _log_search_failure(q, e):
+    metrics.incr('cache.search_games.transient_errors')
+    current_app.logger.error(f"Ошибка при поиске игр в RAWG (q={q}): {e}")
+
+
+def _record_search_path(path, start):
+    # path is 'local' (game index) or 'rawg' (RAWG, possibly from cache).
+    metrics.observe(f"search.games.{path}_ms", (time.perf_counter() - start) * 1000)
+    metrics.incr(f"search.games.{path}")
+    with _path_lock:
+        _path_counts[path] += 1
+        ratio = _path_counts['local'] / (_path_counts['local'] + _path_counts['rawg'])
+    metrics.set_gauge('search.games.local_hit_ratio', round(ratio, 4))
+
+
+def search_games(q, page=1, limit=10):
+    q, page, limit = canonical_search_args(q, page, limit)
+    start = time.perf_counter()
+    result = game_index.search(q, page, limit, _get_upstream_count(q))
+    if result is not None:
+        _record_search_path('local', start)
+        return result
+
+    # Upstream failures are answered with an empty page but never cached.
+    try:
+        result = _search_games_upstream(q, page, limit)
     except RequestException as e:
-        current_app.logger.error(f"Ошибка при поиске игр в RAWG (q={q}): {e}")
-        return {"games": [], "nextPage": None}
+        _log_search_failure(q, e)
+        http_cache.mark_uncacheable()
+        result = {"games": [], "nextPage": None}
+    _record_search_path('rawg', start)
+    return result
+
+
+async def _search_games_rawg_async(q, page, limit):
+    cached_result = _search_games_upstream.peek(q, page, limit)
+    if cached_result is not None:
+        return cached_result
+
+    try:
+        data = await rawg_async_client.get_json(
+            'search',
+            '/games',
+            params=_search_params(q, page, limit),
+            timeout=current_app.config['RAWG_SEARCH_TIMEOUT']
+        )
+        _store_upstream_count(q, data)
+        result = _search_result(data, page)
+    except HTTPError as e:
+        if not _is_not_found(e):
+            _log_search_failure(q, e)
+            return _search_games_upstream.last_known(q, page, limit) or {"games": [], "nextPage": None}
+        result = {"games": [], "nextPage": None}
+    except RequestException as e:
+        _log_search_failure(q, e)
+        return _search_games_upstream.last_known(q, page, limit) or {"games": [], "nextPage": None}
+
+    _search_games_upstream.store(result, q, page, limit)
+    return result
+
+
+async def search_games_async(q, page=1, limit=10):
+    q, page, limit = canonical_search_args(q, page, limit)
+    start = time.perf_counter()
+    result = game_index.search(q, page, limit, _get_upstream_count(q))
+    if result is not None:
+        _record_search_path('local', start)
+        return result
+
+    result = await _search_games_rawg_async(q, page, limit)
+    _record_search_path('rawg', start)
+    return result
+
 
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
 
-def search_users(q, page=1, limit=10):
-    search_term = f"%{q}%"
+
+def _user_search_query(q):
+    if current_app.config['USER_SEARCH_MODE'] == 'substring':
+        # Original behaviour: a leading-wildcard scan over the whole table.
+        return User.query.filter(User.username.ilike(f"%{q}%"))
+
+    term = q.strip().lower()
+    pattern = _escape_like(term)
+    if len(term) < 3:
+        # Too short for trigrams: the substring scan, so "li" still finds
+        # "alice". Only these short terms pay for it.
+        return User.query.filter(User.username.ilike(f"%{pattern}%", escape='\\'))
+
+    # Users having every trigram of the term, re-checked with the exact
+    # substring match, which now only runs on the candidates.
+    grams = trigrams(term)
+    candidate_ids = db.session.query(UsernameTrigram.user_id).filter(
+        UsernameTrigram.trigram.in_(grams)
+    ).group_by(UsernameTrigram.user_id).having(func.count() == len(grams))
+    return User.query.filter(
+        User.id.in_(candidate_ids),
+        User.username.ilike(f"%{pattern}%", escape='\\')
+    )
+
+
+def _count_users(q, query, count_mode):
+    # 'exact' counts on every request, 'cached' reuses a count for up to
+    # USER_SEARCH_COUNT_TTL seconds and 'none' skips counting.
+    if count_mode == 'none':
+        return None
+    if count_mode == 'exact':
+        return query.order_by(None).count()
+
+    key = f"search_users:count:{current_app.config['USER_SEARCH_MODE']}:{q.strip().lower()}"
+    try:
+        total = cache.get(key)
+    except Exception as e:
+        current_app.logger.warning(f"Cache read failed for {key}: {e}")
+        total = None
+    if total is not None:
+        metrics.incr('search.users.count_cache_hits')
+        return total
+
+    metrics.incr('search.users.count_cache_misses')
+    total = query.order_by(None).count()
+    try:
+        cache.set(key, total, timeout=current_app.config['USER_SEARCH_COUNT_TTL'])
+    except Exception as e:
+        current_app.logger.warning(f"Cache write failed for {key}: {e}")
+    return total
+
+
+def search_users(q, page=1, limit=10, count_mode=None):
     empty_result = {"users": [], "total_count": 0, "current_page": 1, "total_pages": 1}
+    count_mode = count_mode or current_app.config['USER_SEARCH_COUNT_MODE']
 
     try:
-        pagination_obj = User.query.filter(
-            User.username.ilike(search_term)
-        ).paginate(
+        query = _user_search_query(q)
+        pagination_obj = query.order_by(User.username).paginate(
             page=page,
             per_page=limit,
-            error_out=False
+            error_out=False,
+            count=False
         )
+        total = _count_users(q, query, count_mode)
 
         return {
             "users": pagination_obj.items,
-            "total_count": pagination_obj.total,
+            "total_count": total,
             "current_page": page,
-            "total_pages": pagination_obj.pages
+            "total_pages": math.ceil(total / limit) if total is not None else None
         }
     except Exception as e:
         current_app.logger.error(f"Ошибка при поиске пользователей в БД (q={q}): {e}")
         return empty_result
 
 
+def search_users_after(q, cursor=None, limit=10):
+    # Keyset pagination: no COUNT and no OFFSET, the next page starts after
+    # the last username served. Raises ValueError on a malformed cursor.
+    query = _user_search_query(q)
+    if cursor:
+        after, = decode_cursor(cursor, ('username',))
+        query = query.filter(User.username > after)
+
+    try:
+        users = query.order_by(User.username).limit(limit + 1).all()
+    except Exception as e:
+        current_app.logger.error(f"Ошибка при поиске пользователей в БД (q={q}): {e}")
+        return {"users": [], "next_cursor": None}
+
+    next_cursor = encode_cursor({'username': users[limit - 1].username}) if len(users) > limit else None
+    return {"users": users[:limit], "next_cursor": next_cursor}
+
+
+def _get_search_executor():
+    global _search_executor
+    if _search_executor is None:
+        with _search_executor_lock:
+            if _search_executor is None:
+                _search_executor = ThreadPoolExecutor(
+                    max_workers=current_app.config['SEARCH_ALL_MAX_WORKERS'],
+                    thread_name_prefix='search-all'
+                )
+    return _search_executor
+
+
+def _finish_branch(name, start):
+    elapsed = round((time.perf_counter() - start) * 1000, 2)
+    metrics.observe(f"search.all.{name}_ms", elapsed)
+    return elapsed
+
+
+def _log_games_branch_failure(e):
+    current_app.logger.error(f"Не удалось выполнить search_games: {e}")
+
+
+def _games_branch(q, limit):
+    try:
+        return search_games(q, page=1, limit=limit).get("games", [])
+    except ValueError as e:
+        _log_games_branch_failure(e)
+        return []
+
+
+def _users_branch(q, limit):
+    return search_users(q, page=1, limit=limit, count_mode='none').get("users", [])
+
+
+def _run_branch_in_context(app, name, branch, q, limit):
+    start = time.perf_counter()
+    with app.app_context():
+        return branch(q, limit), _finish_branch(name, start)
+
+
+def _search_all_result(outcomes):
+    # outcomes maps each branch to (results, elapsed_ms), or to None when it
+    # missed the deadline; its results are then empty and it is listed in
+    # "missing".
+    result = {"missing": [], "timings_ms": {}}
+    for name, outcome in outcomes.items():
+        if outcome is None:
+            metrics.incr(f"search.all.timeouts.{name}")
+            result[name] = []
+            result["missing"].append(name)
+            result["timings_ms"][name] = None
+        else:
+            result[name], result["timings_ms"][name] = outcome
+    return result
+
+
 def search_all(q, user_limit=10, game_limit=10):
+    # The RAWG branch runs on the search pool while the users branch queries
+    # the database in the request thread, so a slow upstream cannot queue the
+    # database work behind it. The games branch is left out, still running,
+    # if it misses the deadline.
+    app = current_app._get_current_object()
+    deadline = time.monotonic() + current_app.config['SEARCH_ALL_DEADLINE']
+    games_future = _get_search_executor().submit(_run_branch_in_context, app, 'games', _games_branch, q, game_limit)
+
+    outcomes = {}
+    start = time.perf_counter()
     try:
-        games_response = search_games(q, page=1, limit=game_limit)
-        games_data = games_response.get("games", [])
+        outcomes['users'] = (_users_branch(q, user_limit), _finish_branch('users', start))
+    except Exception as e:
+        current_app.logger.error(f"Search branch users failed (q={q}): {e}")
+        outcomes['users'] = ([], None)
 
+    wait([games_future], timeout=max(deadline - time.monotonic(), 0))
+    if not games_future.done():
+        outcomes['games'] = None
+    else:
+        try:
+            outcomes['games'] = games_future.result()
+        except Exception as e:
+            current_app.logger.error(f"Search branch games failed (q={q}): {e}")
+            outcomes['games'] = ([], None)
+    return _search_all_result(outcomes)
 
+
+async def _games_branch_async(q, limit):
+    start = time.perf_counter()
+    try:
+        games = (await search_games_async(q, page=1, limit=limit)).get("games", [])
     except ValueError as e:
-        current_app.logger.error(f"Не удалось выполнить search_games: {e}")
-        games_data = []
+        _log_games_branch_failure(e)
+        games = []
+    return games, _finish_branch('games', start)
 
 
-    users_data = search_users(q, page=1, limit=user_limit)
+async def search_all_async(q, user_limit=10, game_limit=10):
+    # The RAWG call runs on the event loop while the user query runs in a
+    # worker thread with its own app context (and database session). A game
+    # search that misses the deadline is cancelled; the user query cannot
+    # be and finishes in the background.
+    app = current_app._get_current_object()
+    tasks = {
+        'games': asyncio.ensure_future(_games_branch_async(q, game_limit)),
+        'users': asyncio.ensure_future(
+            asyncio.to_thread(_run_branch_in_context, app, 'users', _users_branch, q, user_limit)
+        )
+    }
+    await asyncio.wait(tasks.values(), timeout=current_app.config['SEARCH_ALL_DEADLINE'])
 
-    return {
-        "users": users_data.get("users", []),
-        "games": games_data
-    }
\ No newline at end of file
+    outcomes = {}
+    for name, task in tasks.items():
+        if not task.done():
+            task.cancel()
+            outcomes[name] = None
+            continue
+        try:
+            outcomes[name] = task.result()
+        except Exception as e:
+            current_app.logger.error(f"Search branch {name} failed (q={q}): {e}")
+            outcomes[name] = ([], None)
+    return _search_all_result(outcomes)
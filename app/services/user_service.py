@@ -1,4 +1,5 @@
 from app.models.user import User
+from app.models.username_trigram import UsernameTrigram, trigrams
 from app.extensions import db
 from app.schemas.user_schema import user_default_schema, user_update_password_schema, user_login_schema, \
     user_update_schema, user_delete_schema
@@ -6,6 +7,14 @@ from app.exceptions.exceptions import ValidationException
 from marshmallow import ValidationError
 
 
+def _index_username(user):
+    # Keeps the trigram side table used by user search in step with the name.
+    grams = trigrams(user.username)
+    kept = [row for row in user.username_trigrams if row.trigram in grams]
+    existing = {row.trigram for row in kept}
+    user.username_trigrams = kept + [UsernameTrigram(trigram=gram) for gram in sorted(grams - existing)]
+
+
 def register_user(data):
     try:
         validated_data = user_default_schema.load(data)
@@ -23,6 +32,7 @@ def register_user(data):
     new_user = User(**validated_data)
 
     new_user.set_password(password)
+    _index_username(new_user)
 
     db.session.add(new_user)
     db.session.commit()
@@ -81,6 +91,7 @@ def update_user_profile(user_id, data_to_update):
         if db.session.query(User).filter_by(username=validated_data["username"]).first():
             raise ValidationException("Username already exists", status_code=409)
         user.username = validated_data["username"]
+        _index_username(user)
 
     if "email" in validated_data and validated_data["email"] != user.email:
         if db.session.query(User).filter_by(email=validated_data["email"]).first():
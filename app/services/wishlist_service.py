@@ -1,9 +1,83 @@
-from app.models import Wishlist
+import time
+
+from app.models import Wishlist, Game
 from app.extensions import db
 from app.exceptions.exceptions import ValidationException
+from datetime import datetime, timezone
+from flask import current_app
 from marshmallow import ValidationError
+from redis.exceptions import RedisError
+from sqlalchemy import func, and_, or_, insert
+from sqlalchemy.orm import defer
+
+from app.schemas.wishlist_schema import wishlist_item_schema, wishlist_bulk_schema
+from app.utils import metrics
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.utils.http_cache import make_etag
+from app.utils.redis_utils import get_redis
+
+# Rows per statement in bulk writes, well under the bind parameter limits.
+_BULK_CHUNK_SIZE = 500
+
+# Newest first; id breaks ties between items added in the same instant. Both
+# orderings are served by the (user_id, added_on, id) index.
+_NEWEST_FIRST = (Wishlist.added_on.desc(), Wishlist.id.desc())
+
+# Read-only listings select the columns of WishlistSchema as Row tuples,
+# which skips building ORM objects; dump_wishlist_items serializes both.
+_ITEM_COLUMNS = (Wishlist.id, Wishlist.user_id, Wishlist.rawg_game_id, Wishlist.added_on)
+
+
+def _version_key(uid):
+    return f"wishlist:version:{uid}"
+
+
+def _initial_version():
+    # A missing counter (never written, expired or evicted) restarts from the
+    # clock in microseconds, so it never repeats a version handed out before.
+    return time.time_ns() // 1000
 
-from app.schemas.wishlist_schema import wishlist_item_schema
+
+def get_wishlist_version(user_id):
+    # Monotonic per-user version, or None when Redis is unavailable.
+    client = get_redis()
+    if client is None:
+        return None
+    key = _version_key(int(user_id))
+    try:
+        pipe = client.pipeline()
+        pipe.set(key, _initial_version(), nx=True, ex=current_app.config['WISHLIST_VERSION_TTL'])
+        pipe.get(key)
+        return int(pipe.execute()[1])
+    except RedisError as e:
+        current_app.logger.warning(f"Wishlist version read failed for {key}: {e}")
+        return None
+
+
+def _bump_version(user_id):
+    # Called after the commit. The TTL is set only when the counter is
+    # created, so a bump lost to a Redis error stops being served within
+    # WISHLIST_VERSION_TTL.
+    client = get_redis()
+    if client is None:
+        return
+    key = _version_key(int(user_id))
+    try:
+        pipe = client.pipeline()
+        pipe.set(key, _initial_version(), nx=True, ex=current_app.config['WISHLIST_VERSION_TTL'])
+        pipe.incr(key)
+        pipe.execute()
+    except RedisError as e:
+        current_app.logger.warning(f"Wishlist version bump failed for {key}: {e}")
+
+
+def get_wishlist_etag(user_id, *variant):
+    # Strong ETag of one representation of the wishlist (`variant` names the
+    # endpoint and its parameters), or None when no version is available.
+    version = get_wishlist_version(user_id)
+    if version is None:
+        return None
+    return make_etag('wishlist', int(user_id), version, *variant)
 
 
 def get_wishlist_by_userid(user_id):
@@ -13,7 +87,7 @@ def get_wishlist_by_userid(user_id):
         raise ValidationException("Invalid user ID", status_code=400)
 
 
-    wishlist_items = Wishlist.query.filter_by(user_id=uid).all()
+    wishlist_items = db.session.query(*_ITEM_COLUMNS).filter(Wishlist.user_id == uid).all()
     return wishlist_items
 
 
@@ -29,6 +103,7 @@ def add_game_to_wishlist(user_id,data):
 
     db.session.add(wishlist_item)
     db.session.commit()
+    _bump_version(user_id)
 
     return wishlist_item
 
@@ -44,16 +119,136 @@ def delete_game_from_wishlist(user_id, rawg_game_id):
 
     db.session.delete(item)
     db.session.commit()
+    _bump_version(user_id)
     return True
 
 
-def get_paginated_wishlist_by_userid(user_id, page=1, per_page=5):
+def _chunks(values):
+    for start in range(0, len(values), _BULK_CHUNK_SIZE):
+        yield values[start:start + _BULK_CHUNK_SIZE]
+
+
+def _load_bulk(user_id, data):
     try:
         uid = int(user_id)
     except (TypeError, ValueError):
         raise ValidationException("Invalid user ID", status_code=400)
-    pagination = Wishlist.query.filter_by(user_id=uid) \
-        .order_by(Wishlist.added_on.desc()) \
+    try:
+        game_ids = wishlist_bulk_schema.load(data or {})['rawg_game_ids']
+    except ValidationError as e:
+        raise ValidationException(e.messages, status_code=400)
+
+    game_ids = list(dict.fromkeys(game_ids))
+    max_ids = current_app.config['WISHLIST_BULK_MAX_IDS']
+    if len(game_ids) > max_ids:
+        raise ValidationException(f"At most {max_ids} ids per request", status_code=400)
+    return uid, game_ids
+
+
+def _wishlisted_game_ids(uid, game_ids):
+    # Served by the (user_id, rawg_game_id) unique index.
+    found = set()
+    for chunk in _chunks(game_ids):
+        rows = db.session.query(Wishlist.rawg_game_id) \
+            .filter(Wishlist.user_id == uid, Wishlist.rawg_game_id.in_(chunk))
+        found.update(rawg_game_id for rawg_game_id, in rows)
+    return found
+
+
+def _bulk_result(game_ids, statuses, count_key, count, lookup_ms, start):
+    total_ms = round((time.perf_counter() - start) * 1000, 2)
+    return {
+        "results": [{"rawg_game_id": game_id, "status": statuses[game_id]} for game_id in game_ids],
+        count_key: count,
+        "timings_ms": {
+            "lookup": lookup_ms,
+            "write": round(total_ms - lookup_ms, 2),
+            "total": total_ms
+        }
+    }
+
+
+def add_games_to_wishlist(user_id, data):
+    # One transaction: a lookup of the ids already wishlisted, then multi-row
+    # INSERT IGNORE statements for the rest. Rows added concurrently since the
+    # lookup are skipped by the unique constraint rather than failing the
+    # batch; `added` is the number of rows the database actually inserted.
+    # Databases with INSERT ... RETURNING (SQLite, MariaDB) report the ids
+    # they inserted. MySQL only has the row count; when it falls short of the
+    # lookup, the ids are read again before the commit. Under REPEATABLE READ
+    # (the MySQL default) that read sees the snapshot of the lookup plus this
+    # transaction's own rows, so the statuses still match `added`.
+    uid, game_ids = _load_bulk(user_id, data)
+    start = time.perf_counter()
+    existing = _wishlisted_game_ids(uid, game_ids)
+    lookup_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    added_on = datetime.now(timezone.utc)
+    rows = [
+        {'user_id': uid, 'rawg_game_id': game_id, 'added_on': added_on}
+        for game_id in game_ids if game_id not in existing
+    ]
+    statement = insert(Wishlist) \
+        .prefix_with('IGNORE', dialect='mysql') \
+        .prefix_with('OR IGNORE', dialect='sqlite')
+    inserted = set()
+    if db.session.get_bind().dialect.insert_returning:
+        statement = statement.returning(Wishlist.rawg_game_id)
+        for chunk in _chunks(rows):
+            inserted.update(db.session.execute(statement.values(chunk)).scalars())
+        added = len(inserted)
+    else:
+        added = 0
+        for chunk in _chunks(rows):
+            added += db.session.execute(statement.values(chunk)).rowcount
+        inserted = {row['rawg_game_id'] for row in rows}
+        if added < len(rows):
+            inserted = _wishlisted_game_ids(uid, list(inserted)) - existing
+    if added < len(rows):
+        metrics.incr("wishlist.bulk.concurrent_duplicates", len(rows) - added)
+    db.session.commit()
+    if added:
+        _bump_version(uid)
+
+    statuses = {game_id: 'added' if game_id in inserted else 'duplicate' for game_id in game_ids}
+    result = _bulk_result(game_ids, statuses, 'added', added, lookup_ms, start)
+    metrics.incr("wishlist.bulk.added", added)
+    metrics.observe("wishlist.bulk.add_ms", result['timings_ms']['total'])
+    return result
+
+
+def delete_games_from_wishlist(user_id, data):
+    uid, game_ids = _load_bulk(user_id, data)
+    start = time.perf_counter()
+    existing = _wishlisted_game_ids(uid, game_ids)
+    lookup_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    removed = 0
+    for chunk in _chunks([game_id for game_id in game_ids if game_id in existing]):
+        removed += Wishlist.query \
+            .filter(Wishlist.user_id == uid, Wishlist.rawg_game_id.in_(chunk)) \
+            .delete(synchronize_session=False)
+    db.session.commit()
+    if removed:
+        _bump_version(uid)
+
+    statuses = {game_id: 'removed' if game_id in existing else 'not_found' for game_id in game_ids}
+    result = _bulk_result(game_ids, statuses, 'removed', removed, lookup_ms, start)
+    metrics.incr("wishlist.bulk.removed", removed)
+    metrics.observe("wishlist.bulk.delete_ms", result['timings_ms']['total'])
+    return result
+
+
+def get_paginated_wishlist_with_games(user_id, page=1, per_page=5):
+    try:
+        uid = int(user_id)
+    except (TypeError, ValueError):
+        raise ValidationException("Invalid user ID", status_code=400)
+    pagination = db.session.query(Wishlist.rawg_game_id, Game) \
+        .outerjoin(Game, Game.id == Wishlist.rawg_game_id) \
+        .options(defer(Game.description)) \
+        .filter(Wishlist.user_id == uid) \
+        .order_by(*_NEWEST_FIRST) \
         .paginate(page=page, per_page=per_page, error_out=False)
 
     if not pagination.items and page > 1:
@@ -63,6 +258,99 @@ def get_paginated_wishlist_by_userid(user_id, page=1, per_page=5):
     return pagination
 
 
+def _after_cursor(query, cursor):
+    if not cursor:
+        return query
+    try:
+        added_on, item_id = decode_cursor(cursor, ('added_on', 'id'))
+        added_on = datetime.fromisoformat(added_on)
+        item_id = int(item_id)
+    except (TypeError, ValueError):
+        raise ValidationException("Invalid cursor", status_code=400)
+    return query.filter(or_(
+        Wishlist.added_on < added_on,
+        and_(Wishlist.added_on == added_on, Wishlist.id < item_id)
+    ))
+
+
+def _next_cursor(rows, per_page, added_on, item_id):
+    # Rows are fetched one past the page; the extra row only signals that
+    # another page exists.
+    if len(rows) <= per_page:
+        return None
+    last = rows[per_page - 1]
+    return encode_cursor({'added_on': added_on(last).isoformat(), 'id': item_id(last)})
+
+
+def get_wishlist_after(user_id, cursor=None, per_page=20):
+    # Keyset pagination: no COUNT and no OFFSET, the next page starts after
+    # the (added_on, id) of the last item served.
+    try:
+        uid = int(user_id)
+    except (TypeError, ValueError):
+        raise ValidationException("Invalid user ID", status_code=400)
+    query = _after_cursor(db.session.query(*_ITEM_COLUMNS).filter(Wishlist.user_id == uid), cursor)
+    items = query.order_by(*_NEWEST_FIRST).limit(per_page + 1).all()
+
+    return {
+        "items": items[:per_page],
+        "next_cursor": _next_cursor(items, per_page, lambda item: item.added_on, lambda item: item.id)
+    }
+
+
+def get_wishlist_with_games_after(user_id, cursor=None, per_page=5):
+    try:
+        uid = int(user_id)
+    except (TypeError, ValueError):
+        raise ValidationException("Invalid user ID", status_code=400)
+    query = db.session.query(Wishlist.rawg_game_id, Game, Wishlist.added_on, Wishlist.id) \
+        .outerjoin(Game, Game.id == Wishlist.rawg_game_id) \
+        .options(defer(Game.description)) \
+        .filter(Wishlist.user_id == uid)
+    rows = _after_cursor(query, cursor).order_by(*_NEWEST_FIRST).limit(per_page + 1).all()
+
+    return {
+        "items": [(rawg_game_id, game) for rawg_game_id, game, _, _ in rows[:per_page]],
+        "next_cursor": _next_cursor(rows, per_page, lambda row: row.added_on, lambda row: row.id)
+    }
+
+
+def get_preview_page_etag(user_id, cursor=None, page=1, per_page=5):
+    return get_wishlist_etag(user_id, 'previews', cursor, page, per_page)
+
+
+def get_preview_page(user_id, cursor=None, page=1, per_page=5):
+    # The page behind /users/<username>/wishlist and its async variant: by
+    # cursor when one is given (empty for the first page), else by number.
+    if cursor is not None:
+        results = get_wishlist_with_games_after(user_id=user_id, cursor=cursor, per_page=per_page)
+        items = results['items']
+        next_cursor = results['next_cursor']
+        has_next_page = next_cursor is not None
+    else:
+        pagination = get_paginated_wishlist_with_games(user_id=user_id, page=page, per_page=per_page)
+        items = pagination.items
+        next_cursor = None
+        has_next_page = pagination.has_next
+
+    return {
+        "rawg_ids": [rawg_game_id for rawg_game_id, _ in items],
+        "catalog_games": {rawg_game_id: game for rawg_game_id, game in items},
+        "has_next_page": has_next_page,
+        "next_cursor": next_cursor
+    }
+
+
+def preview_page_body(preview_page, previews):
+    # Response body of a preview page, games in wishlist order; games
+    # without a preview are left out.
+    return {
+        "games": [previews[game_id] for game_id in preview_page['rawg_ids'] if game_id in previews],
+        "hasNextPage": preview_page['has_next_page'],
+        "nextCursor": preview_page['next_cursor']
+    }
+
+
 def reset_wishlist(user_id):
     try:
         uid = int(user_id)
@@ -71,4 +359,14 @@ def reset_wishlist(user_id):
 
     Wishlist.query.filter_by(user_id=uid).delete()
     db.session.commit()
+    _bump_version(uid)
     return True
+
+
+def get_most_wishlisted_game_ids(limit=100):
+    rows = db.session.query(Wishlist.rawg_game_id) \
+        .group_by(Wishlist.rawg_game_id) \
+        .order_by(func.count(Wishlist.id).desc()) \
+        .limit(limit) \
+        .all()
+    return [rawg_game_id for rawg_game_id, in rows]
@@ -0,0 +1,141 @@
+import gzip
+import time
+
+from flask import current_app, request
+from werkzeug.http import is_resource_modified
+
+from app.extensions import cache
+from app.utils import http_cache, metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Optional cache of final response bodies for public endpoints: the JSON
+# bytes as sent, plus gzip (and brotli, when installed) variants, stored
+# under the key of the data they were rendered from. A hit is a single cache
+# read that is copied to the client without unpickling the value or
+# serializing it again. Every write of the source entry drops the bodies.
+ENCODINGS = ('br', 'gzip', 'identity')
+
+
+def _key(source_key, encoding):
+    return f"body:{source_key}:{encoding}"
+
+
+def enabled():
+    return current_app.config['RESPONSE_BODY_CACHE_ENABLED']
+
+
+def _variant(etag, last_modified, content_encoding, body):
+    # Each content-coding is its own representation, with its own strong ETag.
+    if etag is not None:
+        etag = http_cache.coding_etag(etag, content_encoding)
+    return etag, last_modified, content_encoding, body
+
+
+def _negotiate():
+    accept = request.accept_encodings
+    if brotli is not None and accept['br'] > 0:
+        return 'br'
+    if accept['gzip'] > 0:
+        return 'gzip'
+    return 'identity'
+
+
+def _respond(name, variant, encoding):
+    etag, last_modified, content_encoding, body = variant
+    if etag is not None and not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = current_app.response_class(status=304)
+        http_cache.record(name, True)
+    else:
+        response = current_app.response_class(body, mimetype='application/json')
+        if content_encoding:
+            response.headers['Content-Encoding'] = content_encoding
+        metrics.incr(f"body_cache.{name}.bytes_sent.{encoding}", len(body))
+        if etag is not None:
+            http_cache.record(name, False)
+    if etag is not None:
+        response.set_etag(etag)
+        if last_modified is not None:
+            response.last_modified = last_modified
+        response.headers['Cache-Control'] = http_cache.public_cache_control(name)
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def serve(source_key, name):
+    # Response from the stored body for the client's Accept-Encoding, or
+    # None on a miss.
+    if not enabled():
+        return None
+    encoding = _negotiate()
+    try:
+        variant = cache.get(_key(source_key, encoding))
+    except Exception as e:
+        current_app.logger.warning(f"Body cache read failed for {source_key}: {e}")
+        return None
+    if variant is None:
+        metrics.incr(f"body_cache.{name}.misses")
+        return None
+    metrics.incr(f"body_cache.{name}.hits")
+    return _respond(name, variant, encoding)
+
+
+def store(source_key, name, value, response):
+    # Stores the body of a fresh 200 response rendered from `value` and
+    # returns the variant the client accepts. Anything else is passed through.
+    if not enabled() or response.status_code != 200 or 'no-store' in response.headers.get('Cache-Control', ''):
+        return response
+
+    config = current_app.config
+    ttl = config['RESPONSE_BODY_CACHE_TTL']
+    _, _, fresh_until = http_cache.validators(value)
+    if fresh_until is not None:
+        # Never outlive the freshness of the source entry: once it is stale,
+        # requests must reach the data cache again to trigger its refresh.
+        ttl = min(ttl, int(fresh_until - time.time()))
+        if ttl <= 0:
+            return response
+
+    etag, _ = response.get_etag()
+    body = response.get_data()
+    identity = _variant(etag, response.last_modified, None, body)
+    variants = {'identity': identity, 'gzip': identity}
+    if brotli is not None:
+        variants['br'] = identity
+    if len(body) >= config['RESPONSE_BODY_COMPRESS_MIN_BYTES']:
+        variants['gzip'] = _variant(etag, response.last_modified, 'gzip',
+                                    gzip.compress(body, compresslevel=config['RESPONSE_BODY_GZIP_LEVEL'], mtime=0))
+        if brotli is not None:
+            variants['br'] = _variant(etag, response.last_modified, 'br',
+                                      brotli.compress(body, quality=config['RESPONSE_BODY_BROTLI_QUALITY']))
+
+    try:
+        cache.set_many({_key(source_key, encoding): variant for encoding, variant in variants.items()}, timeout=ttl)
+        metrics.incr(f"body_cache.{name}.stores")
+    except Exception as e:
+        current_app.logger.warning(f"Body cache write failed for {source_key}: {e}")
+
+    encoding = _negotiate()
+    variant_etag, _, content_encoding, variant_body = variants[encoding]
+    if content_encoding:
+        response.set_data(variant_body)
+        response.headers['Content-Encoding'] = content_encoding
+        if variant_etag is not None:
+            response.set_etag(variant_etag)
+    metrics.incr(f"body_cache.{name}.bytes_sent.{encoding}", response.content_length or 0)
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def invalidate(source_key):
+    if not enabled():
+        return
+    try:
+        # One delete per key: delete_many stops at the first missing key.
+        for encoding in ENCODINGS:
+            cache.delete(_key(source_key, encoding))
+    except Exception as e:
+        current_app.logger.warning(f"Body cache invalidation failed for {source_key}: {e}")
@@ -0,0 +1,35 @@
+import json
+import zlib
+
+from app.utils import metrics
+
+# Compact encoding for cached projections: minified JSON, zlib-compressed
+# once it is large enough for compression to pay off. The first byte tells
+# the two formats apart.
+_RAW = b'j'
+_COMPRESSED = b'z'
+COMPRESS_THRESHOLD = 256
+
+
+def encode(entry_type, value):
+    payload = json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    if len(payload) >= COMPRESS_THRESHOLD:
+        blob = _COMPRESSED + zlib.compress(payload, 6)
+    else:
+        blob = _RAW + payload
+
+    metrics.incr(f"cache.{entry_type}.writes")
+    metrics.incr(f"cache.{entry_type}.bytes_written", len(blob))
+    metrics.observe(f"cache.{entry_type}.entry_bytes", len(blob))
+    return blob
+
+
+def decode(blob):
+    if not blob:
+        return None
+    marker, payload = blob[:1], blob[1:]
+    if marker == _COMPRESSED:
+        payload = zlib.decompress(payload)
+    elif marker != _RAW:
+        return None
+    return json.loads(payload)
@@ -0,0 +1,271 @@
+import functools
+import inspect
+import time
+from datetime import datetime, timezone, timedelta
+
+import requests
+from flask import current_app
+from redis.exceptions import RedisError
+
+from app.extensions import cache
+from app.utils import body_cache, http_cache, metrics, single_flight
+from app.utils.redis_utils import get_redis
+
+# Names of all cached functions, for the key cardinality report.
+registry = []
+
+_CARDINALITY_TTL = 35 * 86400
+
+
+def make_key(name, args):
+    return f"cache:{name}:" + ':'.join(str(arg) for arg in args)
+
+
+def _get_entry(key):
+    try:
+        return cache.get(key)
+    except Exception as e:
+        current_app.logger.warning(f"Cache read failed for {key}: {e}")
+        return None
+
+
+def _set_entry(key, value, timeout, hard_timeout, probation=False):
+    now = time.time()
+    entry = {
+        'value': value,
+        'etag': http_cache.payload_etag(value),
+        'stored_at': now,
+        'fresh_until': now + timeout,
+        'expires_at': now + hard_timeout,
+        'probation': probation
+    }
+    _remember(entry)
+    # Admitted entries are kept past the hard expiry so that a last known
+    # value exists for fallbacks; it is never served as a normal hit after
+    # expires_at. Probationary entries are not worth retaining.
+    retain = 0 if probation else current_app.config['CACHE_STALE_TTL']
+    try:
+        cache.set(key, entry, timeout=hard_timeout + retain)
+    except Exception as e:
+        current_app.logger.warning(f"Cache write failed for {key}: {e}")
+    body_cache.invalidate(key)
+    return entry
+
+
+def _remember(entry):
+    # Validators of the value served to the current request; entries
+    # written before ETags were stored have none.
+    http_cache.remember(entry['value'], entry.get('etag'), entry['stored_at'], entry['fresh_until'])
+    return entry['value']
+
+
+def _is_fresh(entry):
+    return entry is not None and entry['fresh_until'] > time.time()
+
+
+def _is_usable(entry):
+    return entry is not None and entry['expires_at'] > time.time()
+
+
+def cardinality_key(name, kind, day):
+    return f"cache:cardinality:{name}:{kind}:{day.strftime('%Y%m%d')}"
+
+
+def _track(name, key, kind, count=False):
+    # Adds the key to the day's HyperLogLog of distinct keys; with `count`
+    # also bumps the key's request frequency and returns it.
+    client = get_redis()
+    if client is None:
+        return None
+    hll_key = cardinality_key(name, kind, datetime.now(timezone.utc))
+    frequency_key = f"cache:frequency:{key}"
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.pfadd(hll_key, key)
+        pipe.expire(hll_key, _CARDINALITY_TTL)
+        if count:
+            pipe.incr(frequency_key)
+            pipe.expire(frequency_key, current_app.config['CACHE_ADMISSION_WINDOW'])
+        results = pipe.execute()
+    except RedisError as e:
+        current_app.logger.warning(f"Cache key tracking failed for {key}: {e}")
+        return None
+    return results[2] if count else None
+
+
+def get_cardinality(name, days):
+    # Distinct keys computed and admitted over the last `days` days.
+    client = get_redis()
+    if client is None:
+        return None
+    today = datetime.now(timezone.utc)
+    moments = [today - timedelta(days=offset) for offset in range(days)]
+    return {
+        kind: client.pfcount(*(cardinality_key(name, kind, moment) for moment in moments))
+        for kind in ('computed', 'admitted')
+    }
+
+
+def cached(name, timeout, hard_timeout=None, normalize=None, admission=False):
+    # Replacement for cache.memoize on upstream-backed functions: keys are
+    # built from the bound arguments (so positional and keyword calls share
+    # an entry) and concurrent misses are coalesced across workers.
+    #
+    # With a hard_timeout the entry is fresh for `timeout` seconds and served
+    # stale until `hard_timeout` while a background refresh replaces it.
+    # Only a missing or hard-expired entry makes the caller wait.
+    #
+    # When the upstream fails (or its circuit is open) the last known value
+    # is served instead of the error, for as long as the entry is retained
+    # past its hard expiry (CACHE_STALE_TTL).
+    #
+    # `normalize` maps the bound arguments to their canonical form before the
+    # key is built, so equivalent requests share one entry. With `admission`
+    # a key computed on a miss is only stored for CACHE_ADMISSION_PROBATION_TTL
+    # until it has been requested CACHE_ADMISSION_MIN_HITS times within
+    # CACHE_ADMISSION_WINDOW; one-off keys then expire quickly instead of
+    # crowding out hot ones.
+    if hard_timeout is None:
+        hard_timeout = timeout
+    registry.append(name)
+
+    def decorator(f):
+        signature = inspect.signature(f)
+
+        def bind(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = tuple(bound.arguments.values())
+            return tuple(normalize(*arguments)) if normalize else arguments
+
+        def admission_enabled():
+            return admission and current_app.config['CACHE_ADMISSION_MIN_HITS'] > 1
+
+        def admit(key, value):
+            _set_entry(key, value, timeout, hard_timeout)
+            _track(name, key, 'admitted')
+
+        def store_entry(key, value, on_miss):
+            if on_miss and admission_enabled():
+                frequency = _track(name, key, 'computed', count=True)
+                if frequency is not None and frequency < current_app.config['CACHE_ADMISSION_MIN_HITS']:
+                    metrics.incr(f"cache.{name}.probation")
+                    probation_ttl = min(current_app.config['CACHE_ADMISSION_PROBATION_TTL'], timeout)
+                    _set_entry(key, value, probation_ttl, probation_ttl, probation=True)
+                    return
+            else:
+                _track(name, key, 'computed')
+            admit(key, value)
+
+        def promote(key, entry):
+            # Hits on a probationary entry count towards admission; once the
+            # key is frequent enough the value is stored for the full TTL.
+            frequency = _track(name, key, 'computed', count=True)
+            if frequency is not None and frequency >= current_app.config['CACHE_ADMISSION_MIN_HITS']:
+                metrics.incr(f"cache.{name}.promoted")
+                admit(key, entry['value'])
+
+        def compute(arguments, on_miss=False):
+            try:
+                value = f(*arguments)
+            except Exception:
+                # Failures are never stored; the next caller retries.
+                metrics.incr(f"cache.{name}.errors_not_cached")
+                raise
+            store_entry(make_key(name, arguments), value, on_miss)
+            return value
+
+        def lookup(arguments):
+            key = make_key(name, arguments)
+            entry = _get_entry(key)
+            if _is_fresh(entry):
+                metrics.incr(f"cache.{name}.hits")
+                if entry.get('probation'):
+                    promote(key, entry)
+                return _remember(entry)
+
+            if _is_usable(entry):
+                metrics.incr(f"cache.{name}.stale_hits")
+
+                def refresh():
+                    with metrics.timer(f"cache.{name}.refresh_ms"):
+                        compute(arguments)
+
+                if single_flight.run_in_background(key, refresh):
+                    metrics.incr(f"cache.{name}.refreshes")
+                return _remember(entry)
+
+            metrics.incr(f"cache.{name}.misses")
+            return None
+
+        @functools.wraps(f)
+        def decorated_function(*args, **kwargs):
+            arguments = bind(*args, **kwargs)
+            value = lookup(arguments)
+            if value is not None:
+                return value
+
+            key = make_key(name, arguments)
+
+            def poll():
+                latest = _get_entry(key)
+                return _remember(latest) if _is_fresh(latest) else None
+
+            try:
+                return single_flight.run(key, lambda: compute(arguments, on_miss=True), poll)
+            except requests.exceptions.RequestException:
+                value = fallback(arguments)
+                if value is None:
+                    raise
+                return value
+
+        def fallback(arguments):
+            entry = _get_entry(make_key(name, arguments))
+            if entry is None:
+                return None
+            metrics.incr(f"cache.{name}.stale_on_error")
+            return _remember(entry)
+
+        def refresh_entry(*args, **kwargs):
+            return compute(bind(*args, **kwargs))
+
+        def peek(*args, **kwargs):
+            # Cached value (fresh or stale-while-revalidating) or None; used
+            # by callers that fetch misses themselves, e.g. the async routes.
+            return lookup(bind(*args, **kwargs))
+
+        def prefetch(*args, **kwargs):
+            # Fills an entry ahead of demand unless it is already fresh. Runs
+            # as a deduplicated background refresh, at background priority.
+            arguments = bind(*args, **kwargs)
+            key = make_key(name, arguments)
+            if _is_fresh(_get_entry(key)):
+                return False
+
+            def refresh():
+                with metrics.timer(f"cache.{name}.prefetch_ms"):
+                    compute(arguments)
+
+            started = single_flight.run_in_background(key, refresh)
+            if started:
+                metrics.incr(f"cache.{name}.prefetches")
+            return started
+
+        def last_known(*args, **kwargs):
+            # Retained value regardless of age, for callers that handle the
+            # upstream failure themselves.
+            return fallback(bind(*args, **kwargs))
+
+        def store(value, *args, **kwargs):
+            # Value fetched by the caller after a peek() miss.
+            store_entry(make_key(name, bind(*args, **kwargs)), value, on_miss=True)
+
+        decorated_function.refresh = refresh_entry
+        decorated_function.peek = peek
+        decorated_function.store = store
+        decorated_function.last_known = last_known
+        decorated_function.prefetch = prefetch
+        decorated_function.make_cache_key = lambda *args, **kwargs: make_key(name, bind(*args, **kwargs))
+        return decorated_function
+
+    return decorator
@@ -0,0 +1,129 @@
+import time
+
+import requests
+from flask import current_app
+from redis.exceptions import RedisError
+
+from app.utils import metrics
+from app.utils.redis_utils import get_redis
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    pass
+
+
+# Circuit breaker whose state lives in Redis, so that every worker and node
+# trips and recovers together. Calls are counted in fixed windows; the
+# circuit opens when the error or slow-call rate of the current window
+# crosses its threshold. After the open period one caller is let through as
+# a half-open probe: its success closes the circuit, its failure reopens it.
+# Without Redis (or when Redis fails) the breaker lets every call through.
+class CircuitBreaker:
+
+    def __init__(self, name):
+        self.name = name
+        self.open_until_key = f"cb:{name}:open_until"
+        self.probe_key = f"cb:{name}:probe"
+
+    def _config(self, suffix):
+        return current_app.config[f"{self.name.upper()}_CB_{suffix}"]
+
+    def _window_key(self, now):
+        return f"cb:{self.name}:window:{int(now // self._config('WINDOW'))}"
+
+    def _transition(self, source, target):
+        metrics.incr(f"circuit.{self.name}.transitions.{source}_to_{target}")
+        metrics.set_gauge(f"circuit.{self.name}.state", target)
+        current_app.logger.warning(f"Circuit {self.name}: {source} -> {target}")
+
+    def state(self):
+        client = get_redis()
+        if client is None:
+            return CLOSED
+        try:
+            open_until = client.get(self.open_until_key)
+        except RedisError:
+            return CLOSED
+        if open_until is None:
+            return CLOSED
+        return OPEN if float(open_until) > time.time() else HALF_OPEN
+
+    def before_call(self):
+        # Returns True when the call is the half-open probe; raises
+        # CircuitOpenError when the call must not reach the upstream.
+        if not self._config('ENABLED'):
+            return False
+        client = get_redis()
+        if client is None:
+            return False
+        try:
+            open_until = client.get(self.open_until_key)
+            if open_until is None:
+                return False
+            if float(open_until) <= time.time():
+                probe_ttl_ms = int(self._config('PROBE_TIMEOUT') * 1000)
+                if client.set(self.probe_key, 1, nx=True, px=probe_ttl_ms):
+                    metrics.incr(f"circuit.{self.name}.probes")
+                    return True
+        except RedisError as e:
+            current_app.logger.warning(f"Circuit {self.name} state unavailable: {e}")
+            return False
+
+        metrics.incr(f"circuit.{self.name}.rejected")
+        raise CircuitOpenError(f"Circuit {self.name} is open, not calling upstream")
+
+    def release_probe(self):
+        # The probe did not reach the upstream; let another caller try.
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            client.delete(self.probe_key)
+        except RedisError as e:
+            current_app.logger.warning(f"Circuit {self.name} failed to release its probe: {e}")
+
+    def _open(self, client, source):
+        open_seconds = self._config('OPEN_SECONDS')
+        client.set(self.open_until_key, time.time() + open_seconds, ex=int(open_seconds * 10))
+        client.delete(self.probe_key)
+        self._transition(source, OPEN)
+
+    def record(self, success, elapsed, probe=False):
+        if not self._config('ENABLED'):
+            return
+        client = get_redis()
+        if client is None:
+            return
+        slow = elapsed >= self._config('SLOW_CALL_SECONDS')
+        try:
+            if probe:
+                if success and not slow:
+                    client.delete(self.open_until_key, self.probe_key)
+                    self._transition(HALF_OPEN, CLOSED)
+                else:
+                    self._open(client, HALF_OPEN)
+                return
+
+            now = time.time()
+            window_key = self._window_key(now)
+            pipe = client.pipeline(transaction=False)
+            pipe.hincrby(window_key, 'total', 1)
+            pipe.hincrby(window_key, 'failures', 0 if success else 1)
+            pipe.hincrby(window_key, 'slow', 1 if slow else 0)
+            pipe.expire(window_key, int(self._config('WINDOW') * 2))
+            total, failures, slow_calls, _ = pipe.execute()
+
+            if total < self._config('MIN_REQUESTS'):
+                return
+            if failures / total >= self._config('ERROR_RATE') or slow_calls / total >= self._config('SLOW_RATE'):
+                # Only the caller that actually flips the state reports it.
+                open_seconds = self._config('OPEN_SECONDS')
+                if client.set(self.open_until_key, now + open_seconds, nx=True, ex=int(open_seconds * 10)):
+                    client.delete(window_key)
+                    self._transition(CLOSED, OPEN)
+        except RedisError as e:
+            current_app.logger.warning(f"Circuit {self.name} failed to record a call: {e}")
@@ -0,0 +1,19 @@
+import base64
+import json
+
+
+# Opaque pagination cursors: the keyset values of the last row served, as
+# URL-safe base64 JSON. Clients must pass them back unchanged.
+def encode_cursor(values):
+    payload = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(token, fields):
+    # Returns the values of `fields`, raising ValueError on a malformed cursor.
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return [values[field] for field in fields]
+    except (TypeError, KeyError, ValueError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from flask import current_app, request, jsonify, g, has_request_context
+from werkzeug.http import is_resource_modified
+
+from app.utils import metrics
+
+# Cache-Control for responses validated by a version ETag: stored, but
+# revalidated on every use.
+REVALIDATE = 'no-cache'
+PRIVATE_REVALIDATE = 'private, no-cache'
+
+# Public endpoints -> config prefix of their max-age and
+# stale-while-revalidate, in seconds.
+POLICIES = {
+    'games.trending': 'HTTP_CACHE_TRENDING',
+    'games.details': 'HTTP_CACHE_GAME',
+    'search.games': 'HTTP_CACHE_SEARCH'
+}
+
+# Content-codings the response body cache stores, each served with its own
+# ETag derived from the identity one.
+CODINGS = ('gzip', 'br')
+
+_lock = threading.Lock()
+_counts = defaultdict(lambda: {'requests': 0, 'not_modified': 0})
+
+
+def make_etag(*parts):
+    # Strong validator for the representation identified by `parts`, which
+    # must change whenever the response body does.
+    return hashlib.sha1(':'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def payload_etag(value):
+    # Hash of the canonical JSON of a value, computed once when it is cached.
+    payload = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def coding_etag(etag, content_encoding):
+    return f"{etag}-{content_encoding}" if content_encoding else etag
+
+
+def _matching_etag(etag):
+    # The ETag in If-None-Match for any representation of `etag`: the
+    # identity body or one of its compressed variants.
+    for candidate in (etag,) + tuple(coding_etag(etag, coding) for coding in CODINGS):
+        if request.if_none_match.contains_weak(candidate):
+            return candidate
+    return None
+
+
+def remember(value, etag, stored_at=None, fresh_until=None):
+    # Called by the cache layers for the values they hand out, so that
+    # public_response() can answer conditional requests for them without
+    # serializing. Keeps a reference so the id stays unique for the request.
+    if etag is None or not has_request_context():
+        return
+    last_modified = datetime.fromtimestamp(stored_at, timezone.utc) if stored_at else None
+    g.setdefault('http_validators', {})[id(value)] = (value, etag, last_modified, fresh_until)
+
+
+def validators(value):
+    # (etag, last_modified, fresh_until) remembered for `value`, or Nones.
+    return g.get('http_validators', {}).get(id(value), (None, None, None, None))[1:]
+
+
+def mark_uncacheable():
+    # The response of this request must not be stored, e.g. an empty page
+    # served because the upstream failed.
+    if has_request_context():
+        g.http_uncacheable = True
+
+
+def record(name, hit):
+    # Counts conditional-capable requests per endpoint and the share of them
+    # answered with 304.
+    metrics.incr(f"http.{name}.etag_requests")
+    if hit:
+        metrics.incr(f"http.{name}.not_modified")
+    with _lock:
+        counts = _counts[name]
+        counts['requests'] += 1
+        counts['not_modified'] += 1 if hit else 0
+        ratio = counts['not_modified'] / counts['requests']
+    metrics.set_gauge(f"http.{name}.not_modified_ratio", round(ratio, 4))
+
+
+def is_not_modified(name, etag):
+    if etag is None:
+        return False
+    hit = request.if_none_match.contains_weak(etag)
+    record(name, hit)
+    return hit
+
+
+def not_modified(etag, cache_control):
+    response = current_app.response_class(status=304)
+    return with_etag(response, etag, cache_control)
+
+
+def with_etag(response, etag, cache_control):
+    if etag is not None:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = cache_control
+    return response
+
+
+def no_store(response):
+    # For responses that are incomplete or otherwise must not be reused.
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+def versioned_response(value, etag, complete=True):
+    # JSON response validated by a version ETag. An incomplete response,
+    # e.g. a page without the games that failed upstream, does not match the
+    # version and must not be reused.
+    response = jsonify(value)
+    if not complete:
+        return no_store(response)
+    return with_etag(response, etag, REVALIDATE)
+
+
+def public_cache_control(name):
+    prefix = POLICIES[name]
+    config = current_app.config
+    return (
+        f"public, max-age={config[f'{prefix}_MAX_AGE']}, "
+        f"stale-while-revalidate={config[f'{prefix}_SWR']}"
+    )
+
+
+def public_response(value, name):
+    # JSON response for a public endpoint under its POLICIES entry: 304 when
+    # the validators remembered for `value` match the request, otherwise the
+    # body with ETag, Last-Modified and Cache-Control. Values without stored
+    # validators (cache misses, the local game index) get an ETag hashed
+    # from the serialized body. A client holding the ETag of a compressed
+    # variant from the body cache is answered for that variant.
+    config = current_app.config
+    if not config['HTTP_CACHE_ENABLED']:
+        return jsonify(value)
+    if g.get('http_uncacheable'):
+        return no_store(jsonify(value))
+
+    cache_control = public_cache_control(name)
+    etag, last_modified, _ = validators(value)
+    response = None
+    if etag is None:
+        response = jsonify(value)
+        response.add_etag()
+        etag, _ = response.get_etag()
+
+    matched = _matching_etag(etag)
+    if request.if_none_match:
+        hit = matched is not None
+    else:
+        hit = last_modified is not None and not is_resource_modified(request.environ, last_modified=last_modified)
+    if hit:
+        response = current_app.response_class(status=304)
+    elif response is None:
+        response = jsonify(value)
+    if hit and matched not in (None, etag):
+        response.set_etag(matched)
+        response.vary.add('Accept-Encoding')
+    else:
+        response.set_etag(etag)
+    if last_modified is not None:
+        # Assigning None would stamp the current time instead.
+        response.last_modified = last_modified
+    record(name, hit)
+    response.headers['Cache-Control'] = cache_control
+    return response
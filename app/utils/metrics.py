@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+# Per-worker, in-process metrics. Every gunicorn worker keeps its own numbers,
+# exposed through the /metrics endpoint of the worker that answers.
+SAMPLE_SIZE = 1024
+
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_sample_counts = defaultdict(int)
+_samples = defaultdict(lambda: deque(maxlen=SAMPLE_SIZE))
+_gauges = {}
+
+
+def incr(name, value=1):
+    with _lock:
+        _counters[name] += value
+
+
+def observe(name, value):
+    with _lock:
+        _sample_counts[name] += 1
+        _samples[name].append(value)
+
+
+def set_gauge(name, value):
+    with _lock:
+        _gauges[name] = value
+
+
+@contextmanager
+def timer(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, (time.perf_counter() - start) * 1000)
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return round(values[index], 3)
+
+
+def snapshot():
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        samples = {name: sorted(values) for name, values in _samples.items()}
+        counts = dict(_sample_counts)
+
+    distributions = {}
+    for name, values in samples.items():
+        distributions[name] = {
+            'count': counts.get(name, 0),
+            'p50': _percentile(values, 50),
+            'p99': _percentile(values, 99),
+            'max': round(values[-1], 3) if values else None
+        }
+
+    return {
+        'pid': os.getpid(),
+        'counters': counters,
+        'gauges': gauges,
+        'samples': distributions
+    }
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _sample_counts.clear()
+        _samples.clear()
+        _gauges.clear()
@@ -0,0 +1,112 @@
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import requests
+from flask import current_app
+from redis.exceptions import RedisError
+
+from app.utils import metrics
+from app.utils.redis_utils import get_redis
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+_priority = contextvars.ContextVar('rawg_priority', default=INTERACTIVE)
+
+# Token bucket shared by every worker and node. Tokens refill at `rate` per
+# second up to `burst`. Background calls may only take a token while more
+# than `reserve` tokens remain, so that part of the bucket is always left for
+# interactive requests. Usage per minute is counted in the same round trip.
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local reserve = tonumber(ARGV[3])
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+
+local granted = 0
+if tokens - 1 >= reserve then
+    tokens = tokens - 1
+    granted = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+
+local field = ARGV[4]
+if granted == 0 then
+    field = 'rejected_' .. field
+end
+redis.call('HINCRBY', KEYS[2], field, 1)
+redis.call('EXPIRE', KEYS[2], tonumber(ARGV[5]))
+return {granted, tostring(tokens)}
+"""
+
+
+class RateBudgetExceeded(requests.exceptions.RequestException):
+    pass
+
+
+def usage_key(moment):
+    return f"rawg:usage:{moment.strftime('%Y%m%d%H%M')}"
+
+
+@contextmanager
+def background():
+    # Marks upstream calls made inside the block (warming, prefetch,
+    # background refreshes) as lower priority than user-facing requests.
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def acquire():
+    config = current_app.config
+    if not config['RAWG_BUDGET_ENABLED']:
+        return
+    client = get_redis()
+    if client is None:
+        return
+
+    priority = _priority.get()
+    reserve = 0
+    if priority == BACKGROUND:
+        reserve = config['RAWG_BUDGET_BURST'] * config['RAWG_BUDGET_BACKGROUND_RESERVE']
+    try:
+        granted, tokens = client.eval(
+            _TAKE_SCRIPT, 2,
+            'rawg:budget', usage_key(datetime.now(timezone.utc)),
+            config['RAWG_BUDGET_RATE'], config['RAWG_BUDGET_BURST'], reserve,
+            priority, config['RAWG_BUDGET_USAGE_TTL']
+        )
+    except RedisError as e:
+        current_app.logger.warning(f"RAWG rate budget unavailable: {e}")
+        return
+
+    metrics.set_gauge('rawg.budget.tokens', float(tokens))
+    if not granted:
+        metrics.incr(f"rawg.budget.rejected.{priority}")
+        raise RateBudgetExceeded(f"RAWG request budget exhausted for {priority} calls")
+    metrics.incr(f"rawg.budget.granted.{priority}")
+
+
+def get_usage(moments):
+    # Per-minute counters for the given minutes, oldest first.
+    client = get_redis()
+    if client is None:
+        return []
+    pipe = client.pipeline(transaction=False)
+    for moment in moments:
+        pipe.hgetall(usage_key(moment))
+    usage = []
+    for moment, counts in zip(moments, pipe.execute()):
+        counts = {field.decode(): int(value) for field, value in counts.items()}
+        usage.append({'minute': moment.strftime('%Y-%m-%d %H:%M'), **counts})
+    return usage
@@ -0,0 +1,10 @@
+from app.extensions import cache
+
+
+def get_redis():
+    # Raw client behind the Flask-Caching Redis backend, or None when the app
+    # runs on a cache type without one (e.g. SimpleCache in development).
+    try:
+        return getattr(cache.cache, '_write_client', None)
+    except Exception:
+        return None
@@ -0,0 +1,171 @@
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from redis.exceptions import RedisError
+
+from app.utils import metrics, rate_budget
+from app.utils.redis_utils import get_redis
+
+_refresh_executor = None
+_refresh_lock = threading.Lock()
+_local_in_flight = set()
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _acquire(client, lock_key, token):
+    lease_ms = int(current_app.config['CACHE_LOCK_TIMEOUT'] * 1000)
+    return bool(client.set(lock_key, token, nx=True, px=lease_ms))
+
+
+def _release(client, lock_key, token):
+    try:
+        client.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+    except RedisError as e:
+        current_app.logger.warning(f"Failed to release {lock_key}: {e}")
+
+
+def run(key, compute, poll):
+    # Only one caller across all workers computes a missing key; the others
+    # poll the cache for the leader's result. If the leader does not deliver
+    # in time the waiter computes the value itself.
+    client = get_redis()
+    if client is None:
+        return compute()
+
+    lock_key = f"lock:{key}"
+    token = uuid.uuid4().hex
+    try:
+        is_leader = _acquire(client, lock_key, token)
+    except RedisError as e:
+        current_app.logger.warning(f"Single-flight lock unavailable for {key}: {e}")
+        return compute()
+
+    if is_leader:
+        metrics.incr('singleflight.leader')
+        try:
+            return compute()
+        finally:
+            _release(client, lock_key, token)
+
+    deadline = time.monotonic() + current_app.config['CACHE_LOCK_WAIT']
+    interval = current_app.config['CACHE_LOCK_POLL_INTERVAL']
+    while time.monotonic() < deadline:
+        time.sleep(interval)
+        result = poll()
+        if result is not None:
+            metrics.incr('singleflight.coalesced')
+            return result
+        try:
+            if not client.exists(lock_key):
+                break
+        except RedisError:
+            break
+
+    metrics.incr('singleflight.wait_timeout')
+    return compute()
+
+
+async def run_async(key, compute, poll):
+    # run() for coroutines: `compute` is awaited, waiters sleep on the event
+    # loop, and the lock and poll round trips run in a thread so they do not
+    # block the other coroutines.
+    client = get_redis()
+    if client is None:
+        return await compute()
+
+    lock_key = f"lock:{key}"
+    token = uuid.uuid4().hex
+    try:
+        is_leader = await asyncio.to_thread(_acquire, client, lock_key, token)
+    except RedisError as e:
+        current_app.logger.warning(f"Single-flight lock unavailable for {key}: {e}")
+        return await compute()
+
+    if is_leader:
+        metrics.incr('singleflight.leader')
+        try:
+            return await compute()
+        finally:
+            await asyncio.to_thread(_release, client, lock_key, token)
+
+    deadline = time.monotonic() + current_app.config['CACHE_LOCK_WAIT']
+    interval = current_app.config['CACHE_LOCK_POLL_INTERVAL']
+    while time.monotonic() < deadline:
+        await asyncio.sleep(interval)
+        result = await asyncio.to_thread(poll)
+        if result is not None:
+            metrics.incr('singleflight.coalesced')
+            return result
+        try:
+            if not await asyncio.to_thread(client.exists, lock_key):
+                break
+        except RedisError:
+            break
+
+    metrics.incr('singleflight.wait_timeout')
+    return await compute()
+
+
+def _get_refresh_executor():
+    global _refresh_executor
+    if _refresh_executor is None:
+        with _refresh_lock:
+            if _refresh_executor is None:
+                _refresh_executor = ThreadPoolExecutor(
+                    max_workers=current_app.config['CACHE_REFRESH_WORKERS'],
+                    thread_name_prefix='cache-refresh'
+                )
+    return _refresh_executor
+
+
+def _run_refresh(app, key, compute, client, lock_key, token):
+    try:
+        with app.app_context(), rate_budget.background():
+            try:
+                compute()
+            except Exception as e:
+                metrics.incr('singleflight.refresh_failed')
+                current_app.logger.warning(f"Background refresh of {key} failed: {e}")
+            finally:
+                if client is not None:
+                    _release(client, lock_key, token)
+    finally:
+        with _refresh_lock:
+            _local_in_flight.discard(key)
+
+
+def run_in_background(key, compute):
+    # Fire-and-forget refresh. At most one refresh per key runs at a time:
+    # per worker through an in-flight set, across workers through the lease.
+    with _refresh_lock:
+        if key in _local_in_flight:
+            return False
+        _local_in_flight.add(key)
+
+    client = get_redis()
+    lock_key = f"lock:{key}"
+    token = uuid.uuid4().hex
+    if client is not None:
+        try:
+            acquired = _acquire(client, lock_key, token)
+        except RedisError as e:
+            current_app.logger.warning(f"Single-flight lock unavailable for {key}: {e}")
+            acquired = False
+        if not acquired:
+            with _refresh_lock:
+                _local_in_flight.discard(key)
+            return False
+
+    app = current_app._get_current_object()
+    _get_refresh_executor().submit(_run_refresh, app, key, compute, client, lock_key, token)
+    return True
@@ -0,0 +1,190 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask_caching.backends.rediscache import RedisCache
+
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+_CLEAR_ALL = '*'
+
+
+# Redis cache with a small per-worker LRU in front of it. Local entries live
+# for a few seconds at most. Every write or delete goes to Redis first and is
+# then broadcast on a pub/sub channel, so the other workers drop their local
+# copy of the key. Values handed out from the local tier are shared between
+# callers and must be treated as read-only.
+class TieredRedisCache(RedisCache):
+
+    def __init__(self, *args, local_max_entries=1024, local_timeout=5,
+                 invalidation_channel='cache:invalidate', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.local_max_entries = local_max_entries
+        self.local_timeout = local_timeout
+        self.invalidation_channel = invalidation_channel
+        self._local = OrderedDict()
+        self._local_lock = threading.Lock()
+        self._listener_pid = None
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        kwargs.update(
+            local_max_entries=config.get('CACHE_LOCAL_MAX_ENTRIES', 1024),
+            local_timeout=config.get('CACHE_LOCAL_TIMEOUT', 5),
+            invalidation_channel=config.get('CACHE_LOCAL_INVALIDATION_CHANNEL', 'cache:invalidate')
+        )
+        return super().factory(app, config, args, kwargs)
+
+    def _ensure_listener(self):
+        # Threads do not survive a fork, so each worker starts its own.
+        pid = os.getpid()
+        if self._listener_pid == pid:
+            return
+        with self._local_lock:
+            if self._listener_pid == pid:
+                return
+            self._listener_pid = pid
+            self._local.clear()
+        thread = threading.Thread(target=self._listen, name='cache-invalidation', daemon=True)
+        thread.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._write_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.invalidation_channel)
+                for message in pubsub.listen():
+                    keys = json.loads(message['data'])
+                    if _CLEAR_ALL in keys:
+                        self._local_clear()
+                    else:
+                        self._local_drop(keys)
+                    metrics.incr('cache.local.invalidations_received')
+            except Exception as e:
+                # Invalidations may have been missed while disconnected.
+                logger.warning(f"Cache invalidation listener failed: {e}")
+                self._local_clear()
+                time.sleep(1)
+
+    def _publish(self, keys):
+        try:
+            self._write_client.publish(self.invalidation_channel, json.dumps(list(keys)))
+        except Exception as e:
+            logger.warning(f"Failed to publish cache invalidation: {e}")
+            self._local_drop(keys)
+
+    def _local_get(self, key):
+        with self._local_lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return value
+
+    def _local_set(self, key, value):
+        expires_at = time.monotonic() + self.local_timeout
+        with self._local_lock:
+            self._local[key] = (expires_at, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_max_entries:
+                self._local.popitem(last=False)
+                metrics.incr('cache.local.evictions')
+            metrics.set_gauge('cache.local.entries', len(self._local))
+
+    def _local_drop(self, keys):
+        with self._local_lock:
+            for key in keys:
+                self._local.pop(key, None)
+
+    def _local_clear(self):
+        with self._local_lock:
+            self._local.clear()
+
+    def get(self, key):
+        self._ensure_listener()
+        value = self._local_get(key)
+        if value is not None:
+            metrics.incr('cache.local.hits')
+            return value
+        metrics.incr('cache.local.misses')
+
+        value = super().get(key)
+        if value is None:
+            metrics.incr('cache.redis.misses')
+        else:
+            metrics.incr('cache.redis.hits')
+            self._local_set(key, value)
+        return value
+
+    def get_many(self, *keys):
+        self._ensure_listener()
+        values = {}
+        remote_keys = []
+        for key in keys:
+            value = self._local_get(key)
+            if value is None:
+                remote_keys.append(key)
+            else:
+                values[key] = value
+        metrics.incr('cache.local.hits', len(values))
+        metrics.incr('cache.local.misses', len(remote_keys))
+
+        if remote_keys:
+            for key, value in zip(remote_keys, super().get_many(*remote_keys)):
+                if value is None:
+                    metrics.incr('cache.redis.misses')
+                else:
+                    metrics.incr('cache.redis.hits')
+                    values[key] = value
+                    self._local_set(key, value)
+        return [values.get(key) for key in keys]
+
+    def set(self, key, value, timeout=None):
+        result = super().set(key, value, timeout=timeout)
+        self._publish([key])
+        return result
+
+    def add(self, key, value, timeout=None):
+        created = super().add(key, value, timeout=timeout)
+        if created:
+            self._publish([key])
+        return created
+
+    def set_many(self, mapping, timeout=None):
+        result = super().set_many(mapping, timeout=timeout)
+        self._publish(mapping.keys())
+        return result
+
+    def delete(self, key):
+        result = super().delete(key)
+        self._publish([key])
+        return result
+
+    def delete_many(self, *keys):
+        result = super().delete_many(*keys)
+        self._publish(keys)
+        return result
+
+    def unlink(self, *keys):
+        result = super().unlink(*keys)
+        self._publish(keys)
+        return result
+
+    def inc(self, key, delta=1):
+        result = super().inc(key, delta=delta)
+        self._publish([key])
+        return result
+
+    def clear(self):
+        result = super().clear()
+        self._publish([_CLEAR_ALL])
+        return result
@@ -0,0 +1,128 @@
+"""Compare the sync and async RAWG fan-out paths against a local fake RAWG.
+
+Starts a threaded HTTP server that answers /api/games/<id> after a fixed
+delay, then resolves the same number of uncached game previews with:
+
+  * sequential   - one requests.get per game, the pre-batching behaviour
+  * sync pool    - game_service.resolve_game_previews (thread pool)
+  * async        - game_service.resolve_game_previews_async (httpx)
+
+Run from the repository root:
+
+    python benchmarks/bench_async_rawg.py --games 100 --latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.config import Config  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.services import game_service, rawg_async_client, rawg_client  # noqa: E402
+
+
+class BenchConfig(Config):
+    SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    CACHE_TYPE = 'SimpleCache'
+    RAWG_API_KEY = 'bench'
+    RAWG_MAX_RETRIES = 0
+    GAME_PREVIEW_DEADLINE = 120
+
+
+class FakeRawgServer(ThreadingHTTPServer):
+    # The default backlog of 5 drops the SYNs of a concurrent fan-out, which
+    # then waits a second for the retransmit.
+    request_queue_size = 256
+    daemon_threads = True
+
+
+def make_handler(latency):
+    class FakeRawgHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            time.sleep(latency)
+            game_id = int(self.path.split('?')[0].rstrip('/').rsplit('/', 1)[1])
+            body = json.dumps({
+                'id': game_id,
+                'name': f'Game {game_id}',
+                'background_image': None,
+                'metacritic': 80,
+                'parent_platforms': [{'platform': {'slug': 'pc'}}],
+                'description': '<p>' + 'x' * 2000 + '</p>'
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return FakeRawgHandler
+
+
+def timed(label, fn, games):
+    start = time.perf_counter()
+    resolved = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {games:>5} games  {elapsed:8.3f}s  {games / elapsed:8.1f} games/s  resolved={resolved}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.05)
+    args = parser.parse_args()
+
+    server = FakeRawgServer(('127.0.0.1', 0), make_handler(args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    rawg_client.RAWG_API_URL = f"http://127.0.0.1:{server.server_port}/api"
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+
+        def sequential():
+            resolved = 0
+            with requests.Session() as session:
+                for game_id in range(1, args.games + 1):
+                    session.get(f"{rawg_client.RAWG_API_URL}/games/{game_id}", params={'key': 'bench'}, timeout=10).json()
+                    resolved += 1
+            return resolved
+
+        def sync_pool():
+            ids = list(range(10_001, 10_001 + args.games))
+            previews, _, _ = game_service.resolve_game_previews(ids)
+            return len(previews)
+
+        def async_fanout():
+            ids = list(range(20_001, 20_001 + args.games))
+
+            async def run():
+                async with rawg_async_client.open_client():
+                    return await game_service.resolve_game_previews_async(ids)
+
+            previews, _, _ = asyncio.run(run())
+            return len(previews)
+
+        timed('sequential', sequential, args.games)
+        timed('sync pool', sync_pool, args.games)
+        timed('async', async_fanout, args.games)
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""CPU per request and bytes on the wire with and without the response body cache.
+
+Serves /games/trending and /games/<id> from a warm data cache, first through
+the regular path (unpickle the value, jsonify it, send it uncompressed) and
+then with RESPONSE_BODY_CACHE_ENABLED (one cache read, bytes copied as
+stored), for each Accept-Encoding. RAWG is replaced by a local fake server
+that only answers the warm-up requests.
+
+Run from the repository root:
+
+    python benchmarks/bench_response_body.py --requests 2000
+
+Without --redis-url the in-process SimpleCache is used (values are still
+pickled); pass e.g. --redis-url redis://localhost:6379/15 to include Redis.
+brotli is measured only when the package is installed.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.config import Config  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.services import rawg_client  # noqa: E402
+from app.utils import body_cache  # noqa: E402
+
+PLATFORMS = ['pc', 'playstation', 'xbox', 'nintendo', 'mac', 'linux']
+
+
+def fake_game(game_id, details=False):
+    game = {
+        'id': game_id,
+        'slug': f'game-{game_id}',
+        'name': f'The Legend of Game {game_id}: Extended Edition',
+        'background_image': f'https://media.rawg.io/media/games/{game_id:03d}/{game_id:032x}.jpg',
+        'metacritic': 60 + game_id % 40,
+        'released': '2020-05-01',
+        'parent_platforms': [{'platform': {'id': i, 'slug': slug, 'name': slug.title()}}
+                             for i, slug in enumerate(PLATFORMS[:2 + game_id % 4])],
+        'genres': [{'id': 4, 'name': 'Action'}, {'id': 5, 'name': 'RPG'}]
+    }
+    if details:
+        paragraph = ('<p>An open world adventure across a ruined kingdom, with crafting, '
+                     'dungeons, a branching story and hundreds of side quests.</p>\n')
+        game.update({
+            'description': paragraph * 30,
+            'website': f'https://example.com/game-{game_id}',
+            'platforms': [{'platform': {'id': i, 'name': slug.title()}} for i, slug in enumerate(PLATFORMS)]
+        })
+    return game
+
+
+class FakeRawgHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        path = self.path.split('?')[0].rstrip('/')
+        if path.endswith('/games'):
+            payload = {'results': [fake_game(i) for i in range(1, 25)], 'next': 'page=2'}
+        else:
+            payload = fake_game(int(path.rsplit('/', 1)[1]), details=True)
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def measure(client, url, encoding, count):
+    headers = {'Accept-Encoding': encoding}
+    for _ in range(20):
+        client.get(url, headers=headers)
+    total_bytes = 0
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(count):
+        response = client.get(url, headers=headers)
+        total_bytes += len(response.data)
+    cpu_us = (time.process_time() - cpu_start) / count * 1e6
+    wall_us = (time.perf_counter() - wall_start) / count * 1e6
+    return cpu_us, wall_us, total_bytes // count, response.headers.get('Content-Encoding', 'identity')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--redis-url')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeRawgHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    rawg_client.RAWG_API_URL = f"http://127.0.0.1:{server.server_port}/api"
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+        CACHE_TYPE = 'redis' if args.redis_url else 'SimpleCache'
+        CACHE_REDIS_URL = args.redis_url
+        RAWG_API_KEY = 'bench'
+        CACHE_ADMISSION_MIN_HITS = 1
+        GAME_INDEX_ENABLED = False
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+
+    encodings = ['identity', 'gzip'] + (['br'] if body_cache.brotli is not None else [])
+    endpoints = [('trending', '/games/trending?page=1'), ('details', '/games/42')]
+    print(f"{args.requests} requests each, per request averages")
+    print(f"  {'endpoint':<9} {'accept':<9} {'body cache':<11} {'cpu':>9} {'wall':>9} {'bytes':>7}  sent as")
+    for label, url in endpoints:
+        for encoding in encodings:
+            for enabled in (False, True):
+                app.config['RESPONSE_BODY_CACHE_ENABLED'] = enabled
+                cpu_us, wall_us, size, sent_as = measure(client, url, encoding, args.requests)
+                print(f"  {label:<9} {encoding:<9} {'on' if enabled else 'off':<11} "
+                      f"{cpu_us:>7.1f}us {wall_us:>7.1f}us {size:>7}  {sent_as}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Compare the Marshmallow dumps with the precompiled dump functions.
+
+For 1k and 10k rows, times:
+
+  * wishlist: wishlist_items_schema.dump and dump_wishlist_items over ORM
+    objects, plus dump_wishlist_items over Row tuples selected as columns
+    (query time reported separately for both ways of loading)
+  * user search: user_search_schema.dump(..., many=True) and dump_user_search
+
+and checks that both produce the same output.
+
+Run from the repository root:
+
+    python benchmarks/bench_serializers.py --repeat 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.config import Config  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models import User, Wishlist  # noqa: E402
+from app.schemas.user_schema import user_search_schema, dump_user_search  # noqa: E402
+from app.schemas.wishlist_schema import wishlist_items_schema, dump_wishlist_items  # noqa: E402
+
+SIZES = (1000, 10000)
+START = datetime(2026, 1, 1)
+
+
+class BenchConfig(Config):
+    SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    CACHE_TYPE = 'SimpleCache'
+
+
+def seed(count):
+    db.session.execute(User.__table__.insert(), [
+        {'id': i, 'username': f'player_{i}', 'email': f'player{i}@example.com',
+         'password_hash': 'x', 'registered_on': START}
+        for i in range(1, count + 1)
+    ])
+    db.session.execute(Wishlist.__table__.insert(), [
+        {'user_id': 1, 'rawg_game_id': i, 'added_on': START + timedelta(seconds=i)}
+        for i in range(1, count + 1)
+    ])
+    db.session.commit()
+
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+        db.session.expunge_all()
+    return result, statistics.median(timings)
+
+
+def report(label, baseline_ms, ms):
+    print(f"  {label:<34} {ms:>9.2f}ms  {baseline_ms / ms:>5.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        seed(max(SIZES))
+
+        for size in SIZES:
+            objects, orm_query_ms = timed(
+                lambda: Wishlist.query.filter_by(user_id=1).order_by(Wishlist.id).limit(size).all(), args.repeat)
+            rows, row_query_ms = timed(
+                lambda: db.session.query(Wishlist.id, Wishlist.user_id, Wishlist.rawg_game_id, Wishlist.added_on)
+                .filter_by(user_id=1).order_by(Wishlist.id).limit(size).all(), args.repeat)
+            objects = Wishlist.query.filter_by(user_id=1).order_by(Wishlist.id).limit(size).all()
+
+            expected, marshmallow_ms = timed(lambda: wishlist_items_schema.dump(objects), args.repeat)
+            fast, fast_ms = timed(lambda: dump_wishlist_items(objects), args.repeat)
+            from_rows, rows_ms = timed(lambda: dump_wishlist_items(rows), args.repeat)
+            assert fast == expected and from_rows == expected
+
+            print(f"\nwishlist, {size} rows (p50 of {args.repeat})")
+            report('marshmallow dump (ORM objects)', marshmallow_ms, marshmallow_ms)
+            report('compiled dump (ORM objects)', marshmallow_ms, fast_ms)
+            report('compiled dump (Row tuples)', marshmallow_ms, rows_ms)
+            report('query: ORM objects', orm_query_ms, orm_query_ms)
+            report('query: Row tuples', orm_query_ms, row_query_ms)
+
+            users = User.query.order_by(User.id).limit(size).all()
+            expected, marshmallow_ms = timed(lambda: user_search_schema.dump(users, many=True), args.repeat)
+            fast, fast_ms = timed(lambda: dump_user_search(users), args.repeat)
+            assert fast == expected
+
+            print(f"\nuser search, {size} rows (p50 of {args.repeat})")
+            report('marshmallow dump', marshmallow_ms, marshmallow_ms)
+            report('compiled dump', marshmallow_ms, fast_ms)
+
+
+if __name__ == '__main__':
+    main()